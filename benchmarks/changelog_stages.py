@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Per-stage benchmark of the changelog pipeline on synthetic histories.
+
+For each size, it generates a "git log --date iso" text and a real temporary repository (with git fast-import)
+holding the same mixed conventional/non-conventional commits, then measures:
+    - parse: Changelog.parse of the log text
+    - log: reading and parsing the repository history (iter_log + CommitTable.from_records)
+    - group: groupby type and scope
+    - render: markdown report of the grouped tree
+Each stage is reported with its wall time, its throughput and its peak memory (measured with tracemalloc
+in a separate run, so tracing does not inflate the timings).
+
+Usage:
+    python benchmarks/changelog_stages.py [--sizes 1000 10000 100000 1000000] [--no-memory] [--no-repo]
+"""
+
+import argparse
+import os
+import random
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+from typing import Any, Callable, Iterator, List, NamedTuple, Tuple
+
+from smartchangelog.changelog import Changelog
+from smartchangelog.commit import Commit
+from smartchangelog.commitmsg import CommitType
+from smartchangelog.committable import CommitTable
+from smartchangelog.gitcmd import iter_log
+
+SIZES = (1000, 10000, 100000)
+
+AUTHORS = (
+    ('Alice Martin', 'alice@example.com'),
+    ('Bob Durand', 'bob@example.com'),
+    ('Chloé Petit', 'chloe@example.com'),
+    ('David Roux', 'david@example.com'),
+)
+SCOPES = (None, 'ui', 'api', 'cli', 'core', 'docs', 'build')
+WORDS = ('add', 'fix', 'remove', 'update', 'the', 'parser', 'cache', 'button', 'report', 'option', 'tests', 'for')
+
+"""Share of commits with a conventional message"""
+CONVENTIONAL_RATIO = 0.7
+
+
+class SyntheticCommit(NamedTuple):
+    author: str
+    email: str
+    date: datetime
+    message: str
+
+
+class Stage(NamedTuple):
+    name: str
+    seconds: float
+    peak_bytes: int
+
+
+def sentence(rnd: random.Random, min_words: int, max_words: int) -> str:
+    return ' '.join(rnd.choice(WORDS) for _ in range(rnd.randint(min_words, max_words)))
+
+
+def synthetic_commits(size: int, seed: int = 0) -> Iterator[SyntheticCommit]:
+    rnd = random.Random(seed)
+    commit_types = [str(commit_type) for commit_type in CommitType]
+    date = datetime(2015, 1, 1, tzinfo=timezone(timedelta(hours=1)))
+    for _ in range(size):
+        date += timedelta(seconds=rnd.randint(60, 36000))
+        author, email = rnd.choice(AUTHORS)
+        if rnd.random() < CONVENTIONAL_RATIO:
+            scope = rnd.choice(SCOPES)
+            firstline = "{type}{scope}: {subject}".format(type=rnd.choice(commit_types),
+                                                        scope='({})'.format(scope) if scope else '',
+                                                        subject=sentence(rnd, 2, 8))
+        else:
+            firstline = sentence(rnd, 3, 10).capitalize()
+        body_lines = [sentence(rnd, 3, 12) for _ in range(rnd.choice((0, 0, 1, 2, 5)))]
+        message = '\n'.join([firstline, ''] + body_lines) if body_lines else firstline
+        yield SyntheticCommit(author=author, email=email, date=date, message=message)
+
+
+def log_text(commits: List[SyntheticCommit]) -> str:
+    rnd = random.Random(len(commits))
+    lines = []
+    for commit in commits:
+        lines.append('commit {id:040x}'.format(id=rnd.getrandbits(160)))
+        lines.append('Author: {author} <{email}>'.format(author=commit.author, email=commit.email))
+        lines.append('Date:   {date}'.format(date=commit.date.strftime('%Y-%m-%d %H:%M:%S %z')))
+        lines.append('')
+        lines.extend('    ' + line for line in commit.message.split('\n'))
+        lines.append('')
+    return '\n'.join(lines)
+
+
+def create_repository(path: str, commits: List[SyntheticCommit]) -> None:
+    """
+    Create a git repository with one commit per synthetic commit (without files) using git fast-import
+    """
+    subprocess.run(['git', 'init', '--quiet', path], check=True)
+    fast_import = subprocess.Popen(['git', 'fast-import', '--quiet'], cwd=path, stdin=subprocess.PIPE)
+    with fast_import.stdin as stream:
+        for mark, commit in enumerate(commits, start=1):
+            message = (commit.message + '\n').encode('utf-8')
+            identity = '{author} <{email}> {timestamp} {offset}'.format(
+                author=commit.author, email=commit.email, timestamp=int(commit.date.timestamp()),
+                offset=commit.date.strftime('%z'))
+            stream.write('commit refs/heads/master\nmark :{mark}\nauthor {identity}\ncommitter {identity}\n'
+                         .format(mark=mark, identity=identity).encode('utf-8'))
+            stream.write('data {size}\n'.format(size=len(message)).encode('utf-8') + message + b'\n')
+    if fast_import.wait() != 0:
+        raise RuntimeError("git fast-import failed")
+
+
+def measure(name: str, function: Callable[[], Any], memory: bool) -> Tuple[Stage, Any]:
+    start = time.perf_counter()
+    result = function()
+    seconds = time.perf_counter() - start
+    peak_bytes = 0
+    if memory:
+        del result
+        tracemalloc.start()
+        result = function()
+        peak_bytes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return Stage(name=name, seconds=seconds, peak_bytes=peak_bytes), result
+
+
+def print_stage(size: int, stage: Stage) -> None:
+    print("{size:>9} {name:8} {seconds:9.3f} s {throughput:12,.0f} commits/s {peak:10.1f} MiB".format(
+        size=size, name=stage.name, seconds=stage.seconds, throughput=size / stage.seconds if stage.seconds else 0,
+        peak=stage.peak_bytes / (1 << 20)))
+
+
+def benchmark(size: int, memory: bool, repository: bool) -> None:
+    commits = list(synthetic_commits(size))
+    log = log_text(commits)
+
+    stage, changelog = measure('parse', lambda: Changelog.parse(log), memory)
+    print_stage(size, stage)
+
+    if repository:
+        with tempfile.TemporaryDirectory() as path:
+            create_repository(path, commits)
+            cwd = os.getcwd()
+            os.chdir(path)
+            try:
+                stage, changelog = measure('log', lambda: CommitTable.from_records(iter_log()), memory)
+            finally:
+                os.chdir(cwd)
+            print_stage(size, stage)
+
+    stage, node = measure('group', lambda: changelog.groupby(Commit.type, Commit.scope), memory)
+    print_stage(size, stage)
+
+    stage, _ = measure('render', node.report, memory)
+    print_stage(size, stage)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="changelog parse, group and render benchmark")
+    parser.add_argument("-s", "--sizes", help="numbers of commits", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--no-memory", help="do not measure peak memory", action="store_true")
+    parser.add_argument("--no-repo", help="do not create git repositories", action="store_true")
+    args = parser.parse_args()
+
+    print("{size:>9} {name:8} {seconds:>11} {throughput:>22} {peak:>14}".format(
+        size='commits', name='stage', seconds='time', throughput='throughput', peak='peak memory'))
+    for size in args.sizes:
+        benchmark(size, memory=not args.no_memory, repository=not args.no_repo)
+
+
+if __name__ == "__main__":
+    main()
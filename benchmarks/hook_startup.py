@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Startup time benchmark of the commit-msg hook entry points.
+
+Usage:
+    python benchmarks/hook_startup.py [--runs N]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from typing import List
+
+ENTRY_POINTS = (
+    'smartchangelog.scripts.commitmsg_hook',
+    'smartchangelog.scripts.commitmsg_script',
+)
+
+
+def run(module: str, msg_path: str, runs: int) -> List[float]:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-m', module, msg_path], check=True)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="commit-msg hook startup time benchmark")
+    parser.add_argument("-n", "--runs", help="number of runs per entry point", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        msg_path = os.path.join(directory, 'COMMIT_EDITMSG')
+        with open(msg_path, mode='w') as msg_file:
+            msg_file.write('feat(ui): add button\n')
+        baseline = run_python(args.runs)
+        print("{name:45} {median:8.1f} ms".format(name='python (interpreter only)', median=baseline * 1000))
+        for module in ENTRY_POINTS:
+            timings = run(module, msg_path, args.runs)
+            print("{name:45} {median:8.1f} ms (min {min:.1f} ms)".format(
+                name=module, median=statistics.median(timings) * 1000, min=min(timings) * 1000))
+
+
+def run_python(runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'pass'], check=True)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+if __name__ == "__main__":
+    main()
@@ -44,12 +44,13 @@ setup(
 
     keywords='changelog, git, hook, message formatter',
 
-    packages=find_packages(exclude=['contrib', 'docs', 'tests']),
+    packages=find_packages(exclude=['benchmarks', 'contrib', 'docs', 'tests']),
 
     install_requires=[],
 
     extras_require={
-        'test': ['mypy', 'pytest', 'pytest-cov']
+        'test': ['mypy', 'pytest', 'pytest-cov'],
+        'toml': ['toml']
     },
 
     # To provide executable scripts, use entry points in preference to the
@@ -58,6 +59,7 @@ setup(
     entry_points={
         'console_scripts': [
             'commit-msg=smartchangelog.scripts.commitmsg_script:main',
+            'commit-msg-hook=smartchangelog.scripts.commitmsg_hook:main',
             'smartchangelog=smartchangelog.scripts.changelog_script:main',
         ],
     },
@@ -0,0 +1,252 @@
+import hashlib
+import os
+import sqlite3
+import time
+
+from typing import Dict, Iterable, List, Any, NamedTuple, Optional
+
+from smartchangelog import datetools, gitcmd
+from smartchangelog.changelog import Changelog
+from smartchangelog.commit import Commit
+from smartchangelog.commitmsg import CommitMsg
+
+"""Version of the cache layout, to increment when the stored fields or their parsing change"""
+SCHEMA_VERSION = 2
+
+"""Maximum number of commit ids per sqlite query"""
+QUERY_SIZE = 500
+
+"""Maximum total size (in characters) of the cached report fragments, least recently used ones are evicted first"""
+FRAGMENTS_MAX_SIZE = 32 * 1024 * 1024
+
+
+def rules_fingerprint() -> str:
+    """
+    Fingerprint of the commit message rules: parsed commits have to be invalidated when it changes
+    """
+    rules = (
+        SCHEMA_VERSION,
+        CommitMsg.FIRSTLINE_PATTERN.pattern,
+        CommitMsg.FIRSTLINE_MAX_LENGTH,
+        CommitMsg.BODY_MAX_LENGTH,
+        tuple(sorted(str(ct) for ct in CommitMsg.TYPES))
+    )
+    return hashlib.sha1(repr(rules).encode('utf-8')).hexdigest()
+
+
+def default_path() -> str:
+    return os.path.join(gitcmd.get_common_gitdir(), 'smartchangelog', 'cache')
+
+
+def range_end(revision_range: str = None) -> Optional[str]:
+    """
+    Last revision of a revision range, or None if the range is not a simple "start..end" range
+    """
+    if not revision_range:
+        return "HEAD"
+    if "..." in revision_range:
+        return None
+    return revision_range.split("..")[-1] or "HEAD"
+
+
+def range_start(revision_range: str = None) -> Optional[str]:
+    """
+    First revision of a "start..end" revision range, or None if the range has no start
+    """
+    if not revision_range or ".." not in revision_range:
+        return None
+    return revision_range.split("..")[0] or "HEAD"
+
+
+class Snapshot(NamedTuple):
+    """
+    Commit ids of a revision range, from its resolved end (watermark) and start (exclusion, empty if none)
+    """
+    watermark: str
+    exclusion: str
+    commit_ids: List[str]
+
+
+class CommitCache:
+    """
+    On-disk cache of parsed commits, keyed by commit id.
+    Commits are immutable, so only the commits missing from the cache have to be read from git and parsed.
+    It also stores rendered report fragments (e.g. past release sections), keyed by whatever identifies
+    their content.
+    """
+
+    def __init__(self, path: str = None) -> None:
+        path = path or default_path()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.check_schema()
+
+    def __enter__(self) -> 'CommitCache':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def check_schema(self) -> None:
+        fingerprint = rules_fingerprint()
+        with self.connection:
+            self.connection.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            row = self.connection.execute("SELECT value FROM meta WHERE key = 'fingerprint'").fetchone()
+            if row is None or row[0] != fingerprint:
+                self.connection.execute("DROP TABLE IF EXISTS commits")
+                self.connection.execute("DROP TABLE IF EXISTS fragments")
+                self.connection.execute("DROP TABLE IF EXISTS snapshots")
+                self.connection.execute("INSERT OR REPLACE INTO meta VALUES ('fingerprint', ?)", (fingerprint,))
+            self.connection.execute("CREATE TABLE IF NOT EXISTS commits ("
+                                    "id TEXT PRIMARY KEY, author TEXT, date TEXT, "
+                                    "type TEXT, scope TEXT, subject TEXT, body TEXT"
+                                    ") WITHOUT ROWID")
+            self.connection.execute("CREATE TABLE IF NOT EXISTS snapshots ("
+                                    "revision_range TEXT PRIMARY KEY, watermark TEXT, exclusion TEXT, commit_ids BLOB"
+                                    ")")
+            self.connection.execute("CREATE TABLE IF NOT EXISTS fragments ("
+                                    "key TEXT PRIMARY KEY, fragment TEXT, size INTEGER, last_used REAL"
+                                    ")")
+
+    def get(self, commit_ids: Iterable[str]) -> Dict[str, Commit]:
+        commit_ids = list(commit_ids)
+        commits: Dict[str, Commit] = {}
+        for i in range(0, len(commit_ids), QUERY_SIZE):
+            chunk = commit_ids[i:i + QUERY_SIZE]
+            query = "SELECT * FROM commits WHERE id IN ({params})".format(params=",".join("?" * len(chunk)))
+            for row in self.connection.execute(query, chunk):
+                commit = self.row2commit(row)
+                commits[commit.id] = commit
+        return commits
+
+    def put(self, commits: Iterable[Commit]) -> None:
+        with self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO commits VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                        (self.commit2row(commit) for commit in commits))
+
+    def load_snapshot(self, revision_range: str) -> Optional[Snapshot]:
+        row = self.connection.execute("SELECT watermark, exclusion, commit_ids FROM snapshots "
+                                      "WHERE revision_range = ?", (revision_range,)).fetchone()
+        if row is None:
+            return None
+        watermark, exclusion, packed_ids = row
+        commit_ids = [packed_ids[i:i + 20].hex() for i in range(0, len(packed_ids), 20)]
+        return Snapshot(watermark=watermark, exclusion=exclusion, commit_ids=commit_ids)
+
+    def save_snapshot(self, revision_range: str, snapshot: Snapshot) -> None:
+        packed_ids = b"".join(bytes.fromhex(commit_id) for commit_id in snapshot.commit_ids)
+        with self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?)",
+                                    (revision_range, snapshot.watermark, snapshot.exclusion, packed_ids))
+
+    def get_fragment(self, key: str) -> Optional[str]:
+        row = self.connection.execute("SELECT fragment FROM fragments WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        with self.connection:
+            self.connection.execute("UPDATE fragments SET last_used = ? WHERE key = ?", (time.time(), key))
+        return row[0]
+
+    def put_fragment(self, key: str, fragment: str) -> None:
+        with self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO fragments VALUES (?, ?, ?, ?)",
+                                    (key, fragment, len(fragment), time.time()))
+            self.evict_fragments(FRAGMENTS_MAX_SIZE)
+
+    def evict_fragments(self, max_size: int) -> None:
+        """
+        Remove the least recently used fragments until their total size is at most max_size
+        """
+        total_size = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM fragments").fetchone()[0]
+        if total_size <= max_size:
+            return
+        evicted_keys = []
+        for key, size in self.connection.execute("SELECT key, size FROM fragments ORDER BY last_used"):
+            if total_size <= max_size:
+                break
+            evicted_keys.append((key,))
+            total_size -= size
+        self.connection.executemany("DELETE FROM fragments WHERE key = ?", evicted_keys)
+
+    def changelog(self, revision_range: str = None, jobs: int = 1) -> Changelog:
+        return self.commits(list(gitcmd.rev_list(revision_range)), jobs)
+
+    def incremental_changelog(self, revision_range: str = None, jobs: int = 1) -> Changelog:
+        """
+        Changelog of revision_range, built from the commits recorded by the previous call for the same range
+        and the commits added since its watermark, in the order of a full run. It falls back to a full run
+        if the start of the range moved, if the history was rewritten, or if merge commits were added
+        (git may interleave the commits they bring with the recorded ones). A symmetric difference is read with
+        changelog, and anything else that is not a start..end range of revisions (e.g. git log options) without
+        the cache.
+        """
+        end = range_end(revision_range)
+        if end is None:
+            return self.changelog(revision_range, jobs)
+        key = revision_range or "HEAD"
+        start = range_start(revision_range)
+        try:
+            watermark = gitcmd.rev_parse(end)
+            exclusion = gitcmd.rev_parse(start) if start else ''
+        except gitcmd.GitCmdError:
+            # Not a range of revisions git can resolve (e.g. git log options): read it without the cache
+            return Changelog.from_records(gitcmd.iter_log(revision_range), jobs)
+        snapshot = self.load_snapshot(key)
+        if snapshot is None or snapshot.exclusion != exclusion:
+            commit_ids = list(gitcmd.rev_list(revision_range))
+        elif snapshot.watermark == watermark:
+            commit_ids = snapshot.commit_ids
+        elif self.is_linear_extension(revision_range, snapshot.watermark, watermark):
+            new_commit_ids = list(gitcmd.rev_list(revision_range, exclude=snapshot.watermark))
+            commit_ids = new_commit_ids + snapshot.commit_ids
+        else:
+            commit_ids = list(gitcmd.rev_list(revision_range))
+        self.save_snapshot(key, Snapshot(watermark=watermark, exclusion=exclusion, commit_ids=commit_ids))
+        return self.commits(commit_ids, jobs)
+
+    @classmethod
+    def is_linear_extension(cls, revision_range: Optional[str], old_watermark: str, watermark: str) -> bool:
+        """
+        Whether the commits from old_watermark to watermark are a chain without merge commits, so that a full run
+        lists them right before the commits of old_watermark
+        """
+        if not gitcmd.is_ancestor(old_watermark, watermark):
+            return False
+        return not list(gitcmd.rev_list(revision_range, exclude=old_watermark, merges=True))
+
+    def commits(self, commit_ids: List[str], jobs: int = 1) -> Changelog:
+        commits = self.get(commit_ids)
+        missing_ids = [commit_id for commit_id in commit_ids if commit_id not in commits]
+        if missing_ids:
+            parsed = Changelog.from_records(gitcmd.iter_log(revisions=missing_ids), jobs)
+            self.put(parsed)
+            commits.update((commit.id, commit) for commit in parsed)
+        return Changelog(commits[commit_id] for commit_id in commit_ids)
+
+    @classmethod
+    def commit2row(cls, commit: Commit) -> List[Any]:
+        return [
+            commit.id,
+            commit.author,
+            commit.date.isoformat(),
+            commit.type.name if commit.type else None,
+            commit.scope,
+            commit.subject,
+            commit.body
+        ]
+
+    @classmethod
+    def row2commit(cls, row: List[Any]) -> Commit:
+        commit_id, author, date, commit_type, scope, subject, body = row
+        return Commit(
+            id=commit_id,
+            author=author,
+            date=datetools.isostr2date(date),
+            type=CommitMsg.TYPES[commit_type] if commit_type else None,
+            scope=scope,
+            subject=subject,
+            body=body
+        )
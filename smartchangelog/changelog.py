@@ -1,21 +1,116 @@
-import re
-from collections import Iterable
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
 from io import StringIO
-from itertools import groupby
+from itertools import groupby, islice
+from operator import attrgetter, itemgetter
 
-from typing import List, Tuple, Callable, Any, IO, cast
+from typing import List, Tuple, Any, AsyncIterable, IO, Iterable, Iterator, Callable, Deque, FrozenSet, NamedTuple, \
+    Optional, Sequence, TypeVar, cast
 
 from smartchangelog import datetools
 from smartchangelog.commit import Commit
+from smartchangelog.gitcmd import LogRecord
+from smartchangelog.rules import Rules
+
+"""Number of commits sent at once to a parsing process"""
+PARSE_CHUNK_SIZE = 1000
+
+T = TypeVar('T')
+
+
+class _StrippedWriter:
+    """
+    Text stream wrapper writing everything as if str.strip('\n') was applied to the whole output.
+    Only the trailing newlines are held back, until some other text is written.
+    """
+
+    def __init__(self, file: IO) -> None:
+        self.file = file
+        self.started = False
+        self.pending_newlines = 0
+
+    def write(self, string: str) -> None:
+        if not self.started:
+            string = string.lstrip('\n')
+            if not string:
+                return
+            self.started = True
+        content = string.rstrip('\n')
+        if content:
+            self.file.write('\n' * self.pending_newlines + content)
+            self.pending_newlines = len(string) - len(content)
+        else:
+            self.pending_newlines += len(string)
+
+
+class Aggregates(NamedTuple):
+    """
+    Summary of the commits of a subtree
+    """
+    nb_commits: int
+    first: Commit
+    last: Commit
+    authors: FrozenSet[str]
+
+    @property
+    def first_date(self) -> datetime:
+        return self.first.date
+
+    @property
+    def last_date(self) -> datetime:
+        return self.last.date
+
+    @classmethod
+    def of_commit(cls, commit: Commit) -> 'Aggregates':
+        return cls(nb_commits=1, first=commit, last=commit, authors=frozenset((commit.author,)))
+
+    @classmethod
+    def of_commits(cls, commits: Sequence[Commit]) -> Optional['Aggregates']:
+        if not commits:
+            return None
+        timestamp_getter = attrgetter('timestamp')
+        return cls(
+            nb_commits=len(commits),
+            first=min(commits, key=timestamp_getter),
+            last=max(commits, key=timestamp_getter),
+            authors=frozenset(commit.author for commit in commits)
+        )
+
+    @classmethod
+    def merge(cls, aggregates: Iterable['Aggregates']) -> Optional['Aggregates']:
+        aggregates = list(aggregates)
+        if not aggregates:
+            return None
+        timestamp_getter = attrgetter('timestamp')
+        return cls(
+            nb_commits=sum(aggregate.nb_commits for aggregate in aggregates),
+            first=min((aggregate.first for aggregate in aggregates), key=timestamp_getter),
+            last=max((aggregate.last for aggregate in aggregates), key=timestamp_getter),
+            authors=frozenset().union(*(aggregate.authors for aggregate in aggregates))
+        )
 
 
 class Node:
+    """
+    Changelog tree node.
+    Its subtree size is maintained when children are set, its depth and aggregates are computed once and cached
+    until the tree is changed.
+    A group of the last grouping level holds its commits in commits instead of one leaf node per commit:
+    its children are leaf nodes built on access.
+    """
+    __slots__ = ('_parent', 'name', 'criterion', '_children', 'value', 'commits', '_depth', '_size', '_aggregates')
+
     def __init__(self, name: str = None, criterion: property = None, children: Tuple['Node'] = None,
-                 value: Commit = None) -> None:
+                 value: Commit = None, commits: Sequence[Commit] = None) -> None:
         self._parent: 'Node' = None
         self.name = name
         self.criterion = criterion
+        self._depth: Optional[int] = None
+        self._size = 1
+        self._aggregates: Optional[Aggregates] = None
         self._children: Tuple['Node'] = None
+        self.commits = commits
         self.children = children
         self.value = value
 
@@ -25,6 +120,8 @@ class Node:
 
     @property
     def children(self) -> Tuple['Node']:
+        if self._children is None and self.commits is not None:
+            return cast(Tuple[Node], tuple(self.leaf(commit) for commit in self.commits))
         return self._children
 
     @children.setter
@@ -32,21 +129,52 @@ class Node:
         if children is not None:
             for node in children:
                 node._parent = self
+                node.invalidate_depth()
+            self.commits = None
         self._children = children
+        if children:
+            size = sum(node._size for node in children)
+        else:
+            size = len(self.commits) if self.commits is not None else 1
+        delta = size - self._size
+        node = self
+        while node is not None:
+            node._size += delta
+            node._aggregates = None
+            node = node._parent
+
+    def leaf(self, commit: Commit) -> 'Node':
+        node = Node(value=commit)
+        node._parent = self
+        return node
+
+    def invalidate_depth(self) -> None:
+        # A cached depth implies cached depths for all ancestors, so a subtree without cached depth is clean
+        if self._depth is not None:
+            self._depth = None
+            for node in self._children or ():
+                node.invalidate_depth()
 
     def depth_level(self) -> int:
-        if self.parent is None:
-            return 0
-        else:
-            return self.parent.depth_level() + 1
+        if self._depth is None:
+            self._depth = 0 if self._parent is None else self._parent.depth_level() + 1
+        return self._depth
 
     def __len__(self):
-        if not self.children:
-            return 1
-        nb_children = 0
-        for child in self.children:
-            nb_children += len(child)
-        return nb_children
+        return self._size
+
+    def aggregates(self) -> Optional[Aggregates]:
+        """
+        Commit count, first and last commits and distinct authors of the subtree (None without commits)
+        """
+        if self._aggregates is None:
+            if self._children:
+                self._aggregates = Aggregates.merge(filter(None, (node.aggregates() for node in self._children)))
+            elif self.commits is not None:
+                self._aggregates = Aggregates.of_commits(self.commits)
+            elif self.value is not None:
+                self._aggregates = Aggregates.of_commit(self.value)
+        return self._aggregates
 
     @classmethod
     def print_multilines(cls, name: str, value: str, file: IO):
@@ -66,76 +194,220 @@ class Node:
         print("    * date: {date}".format(date=datetools.date2str(commit.date)), file=file)
         print("    * author: {author}".format(author=commit.author), file=file)
         print("    * commit: {id}".format(id=commit.id), file=file)
+        if commit.repository is not None:
+            print("    * repository: {repository}".format(repository=commit.repository), file=file)
 
-    def print_header(self, node: 'Node', file: IO):
+    def print_header(self, node: 'Node', file: IO, stats: bool = False):
         print(
-            "{header} {criterion_name}: {name}".format(
+            "{header} {criterion_name}: {name}{stats}".format(
                 header="#" * (self.depth_level() + 1),
                 criterion_name=Commit.property_name(node.criterion),
-                name=node.name
+                name=node.name,
+                stats=" " + node.format_stats() if stats else ""
             ),
             file=file
         )
         print(file=file)
 
-    def report(self) -> str:
+    def format_stats(self) -> str:
+        """
+        Commit count and months of the subtree, e.g. "(1,234 commits, 2019-01 to 2024-06)"
+        """
+        aggregates = self.aggregates()
+        if aggregates is None:
+            return "(0 commits)"
+        first_month = aggregates.first_date.strftime('%Y-%m')
+        last_month = aggregates.last_date.strftime('%Y-%m')
+        return "({count:,} commit{plural}, {months})".format(
+            count=aggregates.nb_commits,
+            plural='s' if aggregates.nb_commits > 1 else '',
+            months=first_month if first_month == last_month else "{first} to {last}".format(first=first_month,
+                                                                                             last=last_month)
+        )
+
+    def report(self, stats: bool = False) -> str:
         sio = StringIO()
         with sio:
-            if self.children is None:
-                self.print_leaf(commit=self.value, file=sio)
-            else:
-                for node in self.children:
-                    if node.name:
-                        self.print_header(node=node, file=sio)
-                    print(node.report().strip('\n'), file=sio)
-                    print(file=sio)
+            self.write(file=sio, stats=stats)
             string = sio.getvalue()
             return string
 
+    def write(self, file: IO, stats: bool = False) -> None:
+        """
+        Write the report to file while walking the tree once, without building intermediate strings.
+        With stats, group headers show the commit count and the months of the group.
+        """
+        if self.commits is not None:
+            for commit in self.commits:
+                # same output as write_child of a leaf node
+                self.print_leaf(commit=commit, file=cast(IO, _StrippedWriter(file)))
+                print(file=file)
+                print(file=file)
+        elif self.children is None:
+            self.print_leaf(commit=self.value, file=file)
+        else:
+            for node in self.children:
+                self.write_child(node=node, file=file, stats=stats)
+
+    def write_child(self, node: 'Node', file: IO, stats: bool = False) -> None:
+        """
+        Write the part of the report of one child: the report is the concatenation of the parts of all children
+        """
+        if node.name:
+            self.print_header(node=node, file=file, stats=stats)
+        node.write(file=cast(IO, _StrippedWriter(file)), stats=stats)
+        print(file=file)
+        print(file=file)
+
+
+def parse_lines(lines: List[str]) -> List[Commit]:
+    return list(Commit.iter_parse(lines))
+
+
+def parse_records(records: List[LogRecord]) -> List[Commit]:
+    return [Commit.from_record(record) for record in records]
+
+
+def chunk_records(records: Iterable[LogRecord], size: int) -> Iterator[List[LogRecord]]:
+    iterator = iter(records)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
+
+
+def chunk_lines(lines: Iterable[str], size: int) -> Iterator[List[str]]:
+    """
+    Split git log lines in chunks of size commits, on commit header lines
+    """
+    chunk: List[str] = []
+    nb_commits = 0
+    for line in lines:
+        if Commit.HEADER_PATTERN.match(line):
+            if nb_commits == size:
+                yield chunk
+                chunk = []
+                nb_commits = 0
+            nb_commits += 1
+        chunk.append(line)
+    if chunk:
+        yield chunk
+
+
+def parse_chunk(rules: Rules, parse: Callable[[List[T]], List[Commit]], chunk: List[T]) -> List[Commit]:
+    rules.apply()
+    return parse(chunk)
+
+
+def parallel_parse(parse: Callable[[List[T]], List[Commit]], chunks: Iterable[List[T]],
+                   jobs: int) -> Iterator[Commit]:
+    """
+    Parse chunks in a pool of jobs processes and yield commits in their original order.
+    At most two chunks per process are in flight.
+    Chunks are sent with the rules of this process: processes started with spawn or forkserver
+    only know the default rules.
+    """
+    rules = Rules.current()
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        pending: Deque = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(parse_chunk, rules, parse, chunk))
+            if len(pending) >= 2 * jobs:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
 
 class Changelog(List[Commit]):
     @classmethod
-    def parse(cls, log: str) -> 'Changelog':
-        raw_commits = re.findall('(commit [a-z0-9]{40}\n(?:.|\n)*?)(?=commit [a-z0-9]{40}|$)', log)
-        return Changelog([Commit.parse(rc) for rc in raw_commits])
+    def parse(cls, log: str, jobs: int = 1) -> 'Changelog':
+        if jobs > 1:
+            return Changelog(parallel_parse(parse_lines, chunk_lines(StringIO(log), PARSE_CHUNK_SIZE), jobs))
+        return Changelog(Commit.iter_parse(StringIO(log)))
+
+    @classmethod
+    async def aparse(cls, records: AsyncIterable[LogRecord]) -> 'Changelog':
+        """
+        Parse commits as their records arrive, e.g. await Changelog.aparse(gitcmd.async_iter_log('v1.0..HEAD'))
+        """
+        changelog = Changelog()
+        async for record in records:
+            changelog.append(Commit.from_record(record))
+        return changelog
+
+    @classmethod
+    def from_records(cls, records: Iterable[LogRecord], jobs: int = 1) -> 'Changelog':
+        return Changelog(cls.iter_from_records(records, jobs))
+
+    @classmethod
+    def iter_from_records(cls, records: Iterable[LogRecord], jobs: int = 1) -> Iterator[Commit]:
+        if jobs > 1:
+            return parallel_parse(parse_records, chunk_records(records, PARSE_CHUNK_SIZE), jobs)
+        return (Commit.from_record(record) for record in records)
 
     def groupby(self, *criteria: property) -> Node:
-        if len(criteria) == 0:
-            # Sort
-            date_prop = cast(property, Commit.date)
-            date_getter = cast(Callable[[Commit], Any], date_prop.fget)
-            self.sort(key=date_getter)
-            return self.node()
-
-        criteria_list = list(criteria)
-        criterion = criteria_list.pop(0)
-        criterion_getter = cast(Callable[[Commit], Any], criterion.fget)
-
-        # Filter
-        # noinspection PyTypeChecker
-        categorized_changelog = Changelog([commit for commit in self if criterion_getter(commit) is not None])
-        # noinspection PyTypeChecker
-        uncategorized_commits = Changelog([commit for commit in self if criterion_getter(commit) is None])
-
-        # Sort
-        categorized_changelog.sort(key=criterion_getter)
-
-        # Arrange
-        raw_result = self.groupby_to_list(groupby(iterable=categorized_changelog, key=criterion_getter))
-        children_list: List[Node] = []
-        for key, group in raw_result:
-            cl = Changelog(group)
-            children_list.append(Node(name=str(key), criterion=criterion, children=cl.groupby(*criteria_list).children))
-        if len(uncategorized_commits) > 0:
-            children_list.append(uncategorized_commits.node(name="unknown", criterion=criterion))
-        children = cast(Tuple[Node], tuple(children_list))
+        return self.group(self, *criteria)
+
+    @classmethod
+    def group(cls, commits: Iterable[Commit], *criteria: property,
+              pack: Callable[[List[Commit]], Sequence[Commit]] = tuple) -> Node:
+        """
+        Group commits by criteria in a single pass: each commit gets one composite sort key, the commits are
+        sorted once and the tree is built from consecutive runs of equal keys.
+        Inside a group, commits without value for the next criterion are put in a trailing "unknown" group
+        (in their original order), the other ones are sorted by criterion value (by sort key of the type registry
+        for types, see Commit.sort_key), and leaves are sorted by date
+        (using integer timestamps, so dates are only needed when rendering).
+        Commits can be any objects with the Commit attributes, pack builds the commits of each last level group.
+        """
+        getters: List[Callable[[Commit], Any]] = [attrgetter(Commit.property_name(criterion)) for criterion in criteria]
+        sort_keys = [Commit.sort_key(criterion) for criterion in criteria]
+        timestamp_getter = attrgetter('timestamp')
+        decorated: List[Tuple[Tuple, Commit]] = []
+        for index, commit in enumerate(commits):
+            sort_key: List[Any] = []
+            for getter, value_sort_key in zip(getters, sort_keys):
+                value = getter(commit)
+                if value is None:
+                    sort_key += (1, index)
+                    break
+                sort_key += (0, value if value_sort_key is None else value_sort_key(value))
+            else:
+                sort_key.append(timestamp_getter(commit))
+            decorated.append((tuple(sort_key), commit))
+        decorated.sort(key=itemgetter(0))
+        if not criteria:
+            return Node(commits=pack([commit for _, commit in decorated]))
+        return Node(children=cls.build_children(decorated, criteria, getters, 0, pack))
 
-        return Node(children=children)
+    @classmethod
+    def build_children(cls, decorated: List[Tuple[Tuple, Commit]], criteria: Tuple[property, ...],
+                       getters: List[Callable[[Commit], Any]], level: int,
+                       pack: Callable[[List[Commit]], Sequence[Commit]]) -> Tuple[Node]:
+        def level_key(item: Tuple[Tuple, Commit]) -> Any:
+            sort_key = item[0]
+            return sort_key[2 * level + 1] if sort_key[2 * level] == 0 else None
+
+        criterion = criteria[level]
+        getter = getters[level]
+        children_list: List[Node] = []
+        for key, group in groupby(decorated, key=level_key):
+            if key is None:
+                commits = pack([commit for _, commit in group])
+                children_list.append(Node(name="unknown", criterion=criterion, commits=commits))
+            else:
+                items = list(group)
+                name = str(getter(items[0][1]))
+                if level + 1 == len(criteria):
+                    node = Node(name=name, criterion=criterion, commits=pack([commit for _, commit in items]))
+                else:
+                    node = Node(name=name, criterion=criterion,
+                                children=cls.build_children(items, criteria, getters, level + 1, pack))
+                children_list.append(node)
+        return cast(Tuple[Node], tuple(children_list))
 
     def node(self, name: str=None, criterion: property=None) -> Node:
-        # noinspection PyTypeChecker
-        children = cast(Tuple[Node], tuple(Node(value=commit) for commit in self))
-        return Node(name=name, criterion=criterion, children=children)
+        return Node(name=name, criterion=criterion, commits=tuple(self))
 
     @classmethod
     def groupby_to_list(cls, iterable: Iterable):
@@ -1,72 +1,143 @@
 import re
 from datetime import datetime
 
-from typing import NamedTuple, cast
+from typing import Any, Callable, NamedTuple, Iterable, Iterator, List, Dict, Optional, cast
 
 from smartchangelog import datetools
-from smartchangelog.commitmsg import CommitType, CommitMsg, CommitSyntaxError
+from smartchangelog.gitcmd import LogRecord
+from smartchangelog.commitmsg import BaseCommitType, CommitMsg, CommitSyntaxError
 
 
 class _Commit(NamedTuple):
     id: str
     author: str
     date: datetime
-    type: CommitType = None
+    type: BaseCommitType = None
     scope: str = None
     subject: str = None
     body: str = None
+    repository: str = None
+    release: str = None
 
 
 class Commit(_Commit):
+    __slots__ = ()
+
     class Message(NamedTuple):
-        type: CommitType = None
+        type: BaseCommitType = None
         scope: str = None
         subject: str = None
         body: str = None
 
+    @property
+    def timestamp(self) -> int:
+        return datetools.date2timestamp(self.date)
+
+    HEADER_PATTERN = re.compile('commit (?P<id>[a-z0-9]{40})')
+
     @classmethod
     def parse(cls, commit: str) -> 'Commit':
-        m = re.match('commit (?P<id>[a-z0-9]{40})(?:\n|.)+Author: (?P<author>.*)(?:\n|.)+'
-                     'Date: (?P<date>.*)(?P<message>(.|\n)*)',
-                     commit)
-        gd = m.groupdict()
-        message = cls.parse_message(gd['message'])
-        commit_id = gd['id']
-        author = gd['author']
-        date = datetools.str2date(gd['date'].strip())
+        return next(cls.iter_parse(commit.split('\n')))
+
+    @classmethod
+    def iter_parse(cls, lines: Iterable[str]) -> Iterator['Commit']:
+        """
+        Parse the output of "git log --date iso" in a single pass, line by line,
+        and yield each commit as soon as all its lines have been read
+        """
+        commit_id: str = None
+        headers: Dict[str, str] = {}
+        message_lines: List[str] = []
+        in_headers = False
+        for line in lines:
+            line = line.rstrip('\n')
+            m = cls.HEADER_PATTERN.match(line)
+            if m:
+                if commit_id is not None:
+                    yield cls.build(commit_id, headers, message_lines)
+                commit_id = m.group('id')
+                headers = {}
+                message_lines = []
+                in_headers = True
+            elif commit_id is None:
+                continue
+            elif in_headers and line:
+                name, _, value = line.partition(':')
+                headers[name] = value.strip()
+            else:
+                in_headers = False
+                message_lines.append(line)
+        if commit_id is not None:
+            yield cls.build(commit_id, headers, message_lines)
+
+    @classmethod
+    def build(cls, commit_id: str, headers: Dict[str, str], message_lines: List[str]) -> 'Commit':
+        message = cls.parse_message("\n".join(message_lines))
         return cls(
             id=commit_id,
-            author=author,
-            date=date,
+            author=headers['Author'],
+            date=datetools.str2date(headers['Date']),
             type=message.type,
             scope=message.scope,
             subject=message.subject,
             body=message.body
         )
 
+    @classmethod
+    def from_record(cls, record: LogRecord, repository: str = None) -> 'Commit':
+        message = cls.parse_message(record.message)
+        return cls(
+            id=record.id,
+            author="{author} <{email}>".format(author=record.author, email=record.email),
+            date=datetools.isostr2date(record.date),
+            type=message.type,
+            scope=message.scope,
+            subject=message.subject,
+            body=message.body,
+            repository=repository
+        )
+
     @classmethod
     def strip_lines(cls, string) -> str:
         return "\n".join(line.strip() for line in string.strip(' \n').split('\n'))
 
     @classmethod
     def parse_message(cls, message: str) -> Message:
-        message = cls.strip_lines(message)
+        header = cls.parse_header(message)
+        return header._replace(body=cls.parse_body(message, conventional=header.type is not None))
+
+    @classmethod
+    def parse_header(cls, message: str) -> Message:
+        """
+        Parse type, scope and subject of a raw commit message, without building its body.
+        Body lines are only stripped if one of them may be too long for a conventional message.
+        """
+        lines = message.strip(' \n').split('\n')
+        firstline = lines[0].strip()
         try:
-            cm = CommitMsg.parse(message)
-            return cls.Message(**cm.__dict__)
-        except CommitSyntaxError:
-            message = re.sub("\n+", "\n", message)
-            lines = message.split('\n', maxsplit=1)
-            subject = lines[0] or None
-            body = None
-            if len(lines) > 1:
-                body = lines[1] or None
+            if len(lines) > 1 and max(map(len, lines[1:])) > CommitMsg.BODY_MAX_LENGTH:
+                CommitMsg.parse_body(cls.strip_lines('\n'.join(lines[1:])))
+            parsed_firstline = CommitMsg.parse_firstline(firstline)
             return cls.Message(
-                type=None,
-                scope=None,
-                subject=subject,
-                body=body
+                type=parsed_firstline.type,
+                scope=parsed_firstline.scope,
+                subject=parsed_firstline.subject
             )
+        except CommitSyntaxError:
+            return cls.Message(subject=firstline or None)
+
+    @classmethod
+    def parse_body(cls, message: str, conventional: bool) -> Optional[str]:
+        """
+        Body of a raw commit message, conventional telling whether parse_header found a type
+        """
+        message = cls.strip_lines(message)
+        if not conventional:
+            message = re.sub("\n+", "\n", message)
+        lines = message.split('\n', maxsplit=1)
+        if len(lines) > 1:
+            return lines[1] if conventional else lines[1] or None
+        return None
 
     @classmethod
     def property_name(cls, prop: property) -> str:
@@ -74,6 +145,15 @@ class Commit(_Commit):
         i = int(prop.__doc__.split(' ')[-1])
         return tuple(cls._fields)[i]
 
+    @classmethod
+    def sort_key(cls, prop: property) -> Optional[Callable[[Any], Any]]:
+        """
+        Function giving the sort key of a (not None) value of prop, None if values are their own sort keys
+        """
+        if cls.property_name(prop) == 'type':
+            return CommitMsg.TYPES.sort_key
+        return None
+
     @classmethod
     def property(cls, name: str):
         prop = cast(property, _Commit.__dict__[name])
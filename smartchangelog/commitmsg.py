@@ -1,8 +1,7 @@
-import inspect
 import re
 from enum import Enum
 
-from typing import NamedTuple, Optional, Any
+from typing import NamedTuple, Optional, Any, Dict, Iterable, Iterator, Tuple
 
 
 class CommitSyntaxError(Exception):
@@ -11,7 +10,30 @@ class CommitSyntaxError(Exception):
     """
 
 
-class CommitType(Enum):
+class BaseCommitType:
+    """
+    Commit type: built-in (CommitType) or declared in a rules file (smartchangelog.rules.CustomCommitType).
+    Types are ordered by ordinal, their declaration order.
+    """
+    __slots__ = ()
+
+    name: str
+    value: str
+    ordinal: int
+
+    def __lt__(self, other: Any) -> bool:
+        if isinstance(other, BaseCommitType):
+            return self.ordinal < other.ordinal
+        return NotImplemented
+
+    def index(self) -> int:
+        return self.ordinal
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class CommitType(BaseCommitType, Enum):
     feat = 'new feature for the user, not a new feature for build script'
     fix = 'bug fix for the user, not a fix to a build script'
     docs = 'changes to the documentation'
@@ -20,24 +42,61 @@ class CommitType(Enum):
     test = 'adding missing tests, refactoring tests; no production code change'
     chore = 'updating gradle scripts, continuous integration scripts,  etc; no production code change'
 
-    def __lt__(self, other: Any) -> bool:
-        if isinstance(other, CommitType):
-            return self.index() < other.index()
-        return NotImplemented
+    """Declaration order, set once the class is built"""
+    ordinal: int
 
-    def index(self) -> int:
-        return [ct for ct in CommitType].index(self)
 
-    def __str__(self) -> str:
-        return self.name
+for _ordinal, _commit_type in enumerate(CommitType):
+    _commit_type.ordinal = _ordinal
+
+
+class TypeRegistry:
+    """
+    Available commit types, in report order: the types named in order come first, the other ones follow
+    in the order of types.
+    Each type has an integer sort key (its position), so sorting by type only compares integers.
+    Raise ValueError if order names an unknown type or the same type twice.
+    """
+
+    def __init__(self, types: Iterable[BaseCommitType] = CommitType, order: Iterable[str] = ()) -> None:
+        types = tuple(types)
+        by_name = {commit_type.name: commit_type for commit_type in types}
+        order = tuple(order)
+        unknown_names = [name for name in order if name not in by_name]
+        if unknown_names:
+            raise ValueError("unknown types in order: {names}".format(names=', '.join(map(str, unknown_names))))
+        duplicate_names = sorted({name for name in order if order.count(name) > 1})
+        if duplicate_names:
+            raise ValueError("duplicate types in order: {names}".format(names=', '.join(duplicate_names)))
+        first = tuple(by_name[name] for name in order)
+        self.types: Tuple[BaseCommitType, ...] = first + tuple(ct for ct in types if ct not in first)
+        self.sort_keys: Dict[BaseCommitType, int] = {commit_type: i for i, commit_type in enumerate(self.types)}
+        self.by_name: Dict[str, BaseCommitType] = {commit_type.name: commit_type for commit_type in self.types}
+
+    def __iter__(self) -> Iterator[BaseCommitType]:
+        return iter(self.types)
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    def __getitem__(self, name: str) -> BaseCommitType:
+        return self.by_name[name]
+
+    def sort_key(self, commit_type: BaseCommitType) -> int:
+        return self.sort_keys[commit_type]
 
 
 class FirstLine(NamedTuple):
-    type: CommitType
+    type: BaseCommitType
     scope: str
     subject: str
 
 
+class Violation(NamedTuple):
+    id: str
+    error: str
+
+
 class CommitMsg:
     """
     Your commit message have to follow this format:
@@ -70,8 +129,9 @@ class CommitMsg:
     FIRSTLINE_PATTERN = re.compile('^([a-z]+)(?:\(([^\n\t]+)\))?: (.+)$')
     FIRSTLINE_MAX_LENGTH = 70
     BODY_MAX_LENGTH = 80
+    TYPES = TypeRegistry()
 
-    def __init__(self, msg_type: CommitType, scope: str, subject: str, body: str = None) -> None:
+    def __init__(self, msg_type: BaseCommitType, scope: str, subject: str, body: str = None) -> None:
         self.type = msg_type
         self.scope = scope
         self.subject = subject
@@ -93,6 +153,17 @@ class CommitMsg:
             body = None
         return cls(firstline.type, firstline.scope, firstline.subject, body)
 
+    @classmethod
+    def validate_all(cls, messages: Iterable[Tuple[str, str]]) -> Iterator[Violation]:
+        """
+        Validate (id, message) pairs and yield a violation for each invalid message
+        """
+        for msg_id, msg in messages:
+            try:
+                cls.parse(msg)
+            except CommitSyntaxError as e:
+                yield Violation(id=msg_id, error=str(e))
+
     @classmethod
     def parse_firstline(cls, firstline: str) -> FirstLine:
         if len(firstline) > cls.FIRSTLINE_MAX_LENGTH:
@@ -104,7 +175,7 @@ class CommitMsg:
                                     .format(firstline=firstline, pattern=cls.FIRSTLINE_PATTERN.pattern))
         commit_type_str, scope, subject = result.groups()
         try:
-            commit_type = CommitType[commit_type_str]
+            commit_type = cls.TYPES[commit_type_str]
         except KeyError:
             raise CommitSyntaxError("{commit_type} is not an available commit type".format(commit_type=commit_type_str))
         return FirstLine(type=commit_type, scope=scope, subject=subject)
@@ -119,10 +190,18 @@ class CommitMsg:
 
     @classmethod
     def format_allowed_types(cls) -> str:
-        return "\n" + "\n".join("\t* {name}: {doc}".format(name=ct.name, doc=ct.value) for ct in CommitType)
+        return "\n" + "\n".join("\t* {name}: {doc}".format(name=ct.name, doc=ct.value) for ct in cls.TYPES)
+
+    @classmethod
+    def set_type_order(cls, order: Iterable[str]) -> None:
+        """
+        Report the given types first (e.g. feat, fix), then the other ones in their current order
+        """
+        cls.TYPES = TypeRegistry(cls.TYPES, order)
 
     @classmethod
     def help(cls) -> str:
+        import inspect
         return inspect.getdoc(cls).format(allowed_types=cls.format_allowed_types(),
                                           firstline_max_length=cls.FIRSTLINE_MAX_LENGTH,
                                           bodyline_max_length=cls.BODY_MAX_LENGTH)
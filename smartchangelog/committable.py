@@ -0,0 +1,305 @@
+import sys
+from array import array
+from datetime import datetime
+
+from typing import Collection, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union, overload
+
+from smartchangelog import datetools
+from smartchangelog.changelog import Changelog, Node
+from smartchangelog.commit import Commit
+from smartchangelog.commitmsg import BaseCommitType, CommitMsg
+from smartchangelog.gitcmd import LogRecord
+
+
+class StringPool:
+    """
+    Strings stored back to back in a few big str blocks, addressed by their index.
+    None is stored as a negative length.
+    """
+    BLOCK_SIZE = 1 << 20
+
+    def __init__(self) -> None:
+        self.blocks: List[str] = []
+        self.pending: List[str] = []
+        self.pending_size = 0
+        self.block_indexes = array('I')
+        self.starts = array('I')
+        self.lengths = array('i')
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    def append(self, string: Optional[str]) -> None:
+        self.block_indexes.append(len(self.blocks))
+        self.starts.append(self.pending_size)
+        if string is None:
+            self.lengths.append(-1)
+            return
+        self.lengths.append(len(string))
+        self.pending.append(string)
+        self.pending_size += len(string)
+        if self.pending_size >= self.BLOCK_SIZE:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.pending:
+            self.blocks.append(''.join(self.pending))
+        else:
+            self.blocks.append('')
+        self.pending = []
+        self.pending_size = 0
+
+    def __getitem__(self, index: int) -> Optional[str]:
+        length = self.lengths[index]
+        if length < 0:
+            return None
+        block_index = self.block_indexes[index]
+        if block_index == len(self.blocks):
+            self.flush()
+        start = self.starts[index]
+        return self.blocks[block_index][start:start + length]
+
+
+class Interned:
+    """
+    Distinct values stored once, referenced by a small integer (-1 for None)
+    """
+
+    def __init__(self) -> None:
+        self.values: List[str] = []
+        self.indexes: Dict[str, int] = {}
+
+    def index(self, value: Optional[str]) -> int:
+        if value is None:
+            return -1
+        try:
+            return self.indexes[value]
+        except KeyError:
+            self.indexes[value] = len(self.values)
+            self.values.append(sys.intern(value))
+            return self.indexes[value]
+
+    def __getitem__(self, index: int) -> Optional[str]:
+        return self.values[index] if index >= 0 else None
+
+
+class CommitTable(Sequence[Commit]):
+    """
+    Columnar commit store: ids as 20 bytes, interned authors, scopes, repositories and releases,
+    dates as epoch seconds and UTC offset, types as their sort key in the type registry,
+    subjects and bodies in a string pool.
+    Commits appended from git log records keep their raw message instead of their body, which is only parsed
+    when it is read.
+    Items are Commit objects built on access, grouping only builds lightweight CommitView leaves.
+    """
+    """Kinds of values in the bodies pool"""
+    PARSED_BODY = 0
+    RAW_CONVENTIONAL_MESSAGE = 1
+    RAW_MESSAGE = 2
+
+    def __init__(self, commits: Iterable[Commit] = ()) -> None:
+        self.ids = bytearray()
+        self.authors = Interned()
+        self.author_indexes = array('i')
+        self.timestamps = array('q')
+        self.utc_offsets = array('i')
+        self.commit_types = CommitMsg.TYPES
+        self.types = array('b')
+        self.scopes = Interned()
+        self.scope_indexes = array('i')
+        self.subjects = StringPool()
+        self.bodies = StringPool()
+        self.body_kinds = array('b')
+        self.repositories = Interned()
+        self.repository_indexes = array('i')
+        self.releases = Interned()
+        self.release_indexes = array('i')
+        self.extend(commits)
+
+    @classmethod
+    def from_records(cls, records: Iterable[LogRecord], jobs: int = 1,
+                     types: Collection[str] = None) -> 'CommitTable':
+        """
+        Commits of records, only the ones of one of types (type names) if any: the other records are dropped
+        as soon as their first line is parsed
+        """
+        if jobs > 1:
+            if types is not None:
+                records = (record for record in records if cls.has_type(Commit.parse_header(record.message), types))
+            return cls(Changelog.iter_from_records(records, jobs))
+        table = cls()
+        for record in records:
+            header = Commit.parse_header(record.message)
+            if types is None or cls.has_type(header, types):
+                table.append_record(record, header=header)
+        return table
+
+    @classmethod
+    def has_type(cls, header: Commit.Message, types: Collection[str]) -> bool:
+        return header.type is not None and str(header.type) in types
+
+    def append(self, commit: Commit) -> None:
+        self.append_fields(commit.id, commit.author, commit.timestamp, int(commit.date.utcoffset().total_seconds()),
+                           commit.type, commit.scope, commit.subject, commit.body, self.PARSED_BODY,
+                           commit.repository, commit.release)
+
+    def append_record(self, record: LogRecord, repository: str = None, release: str = None,
+                      header: Commit.Message = None) -> None:
+        """
+        Append a git log record without building a Commit nor a datetime, and without parsing its body
+        (nor its first line if its parsed header is given)
+        """
+        header = header or Commit.parse_header(record.message)
+        timestamp, utc_offset = datetools.isostr2timestamp(record.date)
+        author = "{author} <{email}>".format(author=record.author, email=record.email)
+        body_kind = self.RAW_CONVENTIONAL_MESSAGE if header.type else self.RAW_MESSAGE
+        self.append_fields(record.id, author, timestamp, utc_offset,
+                           header.type, header.scope, header.subject, record.message, body_kind, repository,
+                           release)
+
+    def append_fields(self, commit_id: str, author: str, timestamp: int, utc_offset: int,
+                      commit_type: Optional[BaseCommitType], scope: Optional[str], subject: Optional[str],
+                      body: Optional[str], body_kind: int, repository: str = None, release: str = None) -> None:
+        self.ids += bytes.fromhex(commit_id)
+        self.author_indexes.append(self.authors.index(author))
+        self.timestamps.append(timestamp)
+        self.utc_offsets.append(utc_offset)
+        self.types.append(self.commit_types.sort_keys[commit_type] if commit_type else -1)
+        self.scope_indexes.append(self.scopes.index(scope))
+        self.subjects.append(subject)
+        self.bodies.append(body)
+        self.body_kinds.append(body_kind)
+        self.repository_indexes.append(self.repositories.index(repository))
+        self.release_indexes.append(self.releases.index(release))
+
+    def extend(self, commits: Iterable[Commit]) -> None:
+        for commit in commits:
+            self.append(commit)
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @overload
+    def __getitem__(self, index: int) -> Commit:
+        pass
+
+    @overload
+    def __getitem__(self, index: slice) -> List[Commit]:
+        pass
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Commit, List[Commit]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        view = CommitView(self, index if index >= 0 else len(self) + index)
+        return Commit(
+            id=view.id,
+            author=view.author,
+            date=view.date,
+            type=view.type,
+            scope=view.scope,
+            subject=view.subject,
+            body=view.body,
+            repository=view.repository,
+            release=view.release
+        )
+
+    def views(self) -> Iterator['CommitView']:
+        return (CommitView(self, i) for i in range(len(self)))
+
+    def groupby(self, *criteria: property) -> Node:
+        return Changelog.group(self.views(), *criteria, pack=self.pack)
+
+    def pack(self, views: List['CommitView']) -> 'CommitSelection':
+        """
+        Commits of a group, stored as indexes in this table
+        """
+        return CommitSelection(self, array('i', (view.index for view in views)))
+
+
+class CommitSelection(Sequence['CommitView']):
+    """
+    Commits of a CommitTable given by their indexes, accessed as CommitView objects
+    """
+    __slots__ = ('table', 'indexes')
+
+    def __init__(self, table: CommitTable, indexes: array) -> None:
+        self.table = table
+        self.indexes = indexes
+
+    def __len__(self) -> int:
+        return len(self.indexes)
+
+    @overload
+    def __getitem__(self, index: int) -> 'CommitView':
+        pass
+
+    @overload
+    def __getitem__(self, index: slice) -> 'CommitSelection':
+        pass
+
+    def __getitem__(self, index: Union[int, slice]) -> Union['CommitView', 'CommitSelection']:
+        if isinstance(index, slice):
+            return CommitSelection(self.table, self.indexes[index])
+        return CommitView(self.table, self.indexes[index])
+
+    def __iter__(self) -> Iterator['CommitView']:
+        table = self.table
+        return (CommitView(table, index) for index in self.indexes)
+
+
+class CommitView:
+    """
+    Read-only view on one commit of a CommitTable, with the same attributes as Commit
+    """
+    __slots__ = ('table', 'index')
+
+    def __init__(self, table: CommitTable, index: int) -> None:
+        if not 0 <= index < len(table):
+            raise IndexError("commit index out of range")
+        self.table = table
+        self.index = index
+
+    @property
+    def id(self) -> str:
+        return self.table.ids[self.index * 20:(self.index + 1) * 20].hex()
+
+    @property
+    def author(self) -> str:
+        return self.table.authors[self.table.author_indexes[self.index]]
+
+    @property
+    def date(self) -> datetime:
+        return datetools.timestamp2date(self.table.timestamps[self.index], self.table.utc_offsets[self.index])
+
+    @property
+    def timestamp(self) -> int:
+        return self.table.timestamps[self.index]
+
+    @property
+    def type(self) -> Optional[BaseCommitType]:
+        type_index = self.table.types[self.index]
+        return self.table.commit_types.types[type_index] if type_index >= 0 else None
+
+    @property
+    def scope(self) -> Optional[str]:
+        return self.table.scopes[self.table.scope_indexes[self.index]]
+
+    @property
+    def subject(self) -> Optional[str]:
+        return self.table.subjects[self.index]
+
+    @property
+    def body(self) -> Optional[str]:
+        body = self.table.bodies[self.index]
+        body_kind = self.table.body_kinds[self.index]
+        if body_kind == CommitTable.PARSED_BODY:
+            return body
+        return Commit.parse_body(body, conventional=body_kind == CommitTable.RAW_CONVENTIONAL_MESSAGE)
+
+    @property
+    def repository(self) -> Optional[str]:
+        return self.table.repositories[self.table.repository_indexes[self.index]]
+
+    @property
+    def release(self) -> Optional[str]:
+        return self.table.releases[self.table.release_indexes[self.index]]
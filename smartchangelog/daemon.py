@@ -0,0 +1,208 @@
+"""
+Commit message validation daemon.
+
+It keeps the commit message validator loaded and answers validation requests on a Unix domain socket:
+the client sends its working directory, a NUL character and the raw commit message, and shuts down writing.
+The daemon answers "OK" or "KO" on the first line, followed by the error and the help for invalid messages,
+or "ERROR" followed by the error when the message could not be checked: the client then falls back to the hook
+running the validator in its own process, as when the daemon is not running.
+Messages are validated with the rules of the client's repository (see smartchangelog.rules), loaded once per
+rules file version. Without working directory, the rules of the daemon's working directory are used.
+The socket lives in a directory private to the user, and only a socket owned by the user is connected to or replaced.
+"""
+
+import os
+import socket
+import socketserver
+import stat
+import sys
+import tempfile
+import threading
+from functools import lru_cache
+
+from typing import Optional
+
+from smartchangelog.commitmsg import CommitMsg, CommitSyntaxError
+from smartchangelog.rules import Rules, RulesError
+
+CLIENT_TEMPLATE = '''#!{python} -SE
+# commit-msg hook installed by smartchangelog.
+# It asks the smartchangelog daemon to validate the message,
+# and falls back to the commit-msg-hook command when the daemon is not running.
+import os
+import socket
+import sys
+
+SOCKET_PATH = {socket_path!r}
+FALLBACK_HOOK_PATH = {fallback_hook_path!r}
+
+
+def fallback():
+    os.execv(FALLBACK_HOOK_PATH, [FALLBACK_HOOK_PATH] + sys.argv[1:])
+
+
+def main():
+    with open(sys.argv[1], 'rb') as msg_file:
+        msg = msg_file.read()
+    try:
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        client.settimeout({timeout!r})
+        if os.lstat(SOCKET_PATH).st_uid != os.getuid():
+            raise PermissionError(SOCKET_PATH)
+        client.connect(SOCKET_PATH)
+        client.sendall(os.fsencode(os.getcwd()) + b'\\0' + msg)
+        client.shutdown(socket.SHUT_WR)
+        response = b''.join(iter(lambda: client.recv(65536), b''))
+        client.close()
+    except OSError:
+        fallback()
+    status, _, error = response.decode('utf-8', 'replace').partition('\\n')
+    if status not in ('OK', 'KO'):
+        # Empty or malformed response, or error of the daemon
+        fallback()
+    if status == 'KO':
+        sys.stderr.write(error + '\\n')
+        sys.exit(1)
+
+
+main()
+'''
+
+"""Seconds the client waits for the daemon"""
+TIMEOUT = 5.0
+
+"""Held while rules are applied and used: they are CommitMsg class attributes, shared by the handler threads"""
+RULES_LOCK = threading.Lock()
+
+
+def default_socket_path() -> str:
+    """
+    Socket in the user's runtime directory or, without one, in a private directory of the temporary directory
+    """
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if not runtime_dir:
+        runtime_dir = os.path.join(tempfile.gettempdir(), 'smartchangelog-{uid}'.format(uid=os.getuid()))
+        try:
+            os.mkdir(runtime_dir, 0o700)
+        except FileExistsError:
+            pass
+        status = os.lstat(runtime_dir)
+        if not stat.S_ISDIR(status.st_mode) or status.st_uid != os.getuid() or status.st_mode & 0o077:
+            raise PermissionError("{path} is not a private directory of the current user".format(path=runtime_dir))
+    return os.path.join(runtime_dir, 'smartchangelog.sock')
+
+
+def check_owner(path: str) -> None:
+    """
+    Raise PermissionError if path exists and is not owned by the current user
+    """
+    try:
+        owner = os.lstat(path).st_uid
+    except FileNotFoundError:
+        return
+    if owner != os.getuid():
+        raise PermissionError("{path} is not owned by the current user".format(path=path))
+
+
+def client_script(fallback_hook_path: str, socket_path: str = None, python: str = None) -> str:
+    return CLIENT_TEMPLATE.format(python=python or sys.executable, socket_path=socket_path or default_socket_path(),
+                                  fallback_hook_path=fallback_hook_path, timeout=TIMEOUT)
+
+
+@lru_cache(maxsize=16)
+def help_message(rules: Rules) -> str:
+    """
+    Help of rules, which must be applied
+    """
+    return CommitMsg.help()
+
+
+def check(msg: str, directory: str = None) -> bytes:
+    """
+    Validate msg with the rules of directory (the current directory by default)
+    """
+    try:
+        rules = Rules.load(directory)
+    except RulesError as e:
+        return "KO\n{error}".format(error=e).encode('utf-8')
+    with RULES_LOCK:
+        rules.apply()
+        try:
+            CommitMsg.parse(msg)
+            return b'OK\n'
+        except CommitSyntaxError as e:
+            return "KO\n{error}\n\n{help}".format(error=e, help=help_message(rules)).encode('utf-8')
+
+
+class ValidationHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        request = self.rfile.read()
+        directory, separator, msg = request.partition(b'\0')
+        if not separator:
+            # Client without working directory
+            directory, msg = b'', request
+        try:
+            response = check(msg.decode('utf-8', 'replace'), os.fsdecode(directory) or None)
+        except Exception as e:
+            response = "ERROR\n{error!r}".format(error=e).encode('utf-8')
+        try:
+            self.wfile.write(response)
+        except (BrokenPipeError, ConnectionResetError):
+            # Client gone, e.g. is_running() probe
+            pass
+
+
+class ValidationServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def is_running(socket_path: str = None) -> bool:
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        socket_path = socket_path or default_socket_path()
+        check_owner(socket_path)
+        client.connect(socket_path)
+        return True
+    except OSError:
+        return False
+    finally:
+        client.close()
+
+
+def serve(socket_path: str = None) -> None:
+    socket_path = socket_path or default_socket_path()
+    check_owner(socket_path)
+    if is_running(socket_path):
+        raise RuntimeError("A validation daemon is already listening on {path}".format(path=socket_path))
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    old_umask = os.umask(0o177)
+    try:
+        server = ValidationServer(socket_path, ValidationHandler)
+    finally:
+        os.umask(old_umask)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        os.remove(socket_path)
+
+
+def validate(msg: str, socket_path: str = None, directory: str = None) -> Optional[str]:
+    """
+    Validate msg with the daemon, using the rules of directory (the current directory by default):
+    return None if it is valid, the error otherwise.
+    Raise OSError if the daemon is not running or could not check msg.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(TIMEOUT)
+        socket_path = socket_path or default_socket_path()
+        check_owner(socket_path)
+        client.connect(socket_path)
+        client.sendall(os.fsencode(os.path.abspath(directory or os.getcwd())) + b'\0' + msg.encode('utf-8'))
+        client.shutdown(socket.SHUT_WR)
+        response = b''.join(iter(lambda: client.recv(65536), b''))
+    status, _, error = response.decode('utf-8', 'replace').partition('\n')
+    if status not in ('OK', 'KO'):
+        raise OSError("Unexpected response of the validation daemon: {response!r}".format(response=response))
+    return None if status == 'OK' else error
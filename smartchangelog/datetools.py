@@ -1,10 +1,65 @@
-from datetime import datetime
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+
+from typing import Tuple
 
 date_format = "%Y-%m-%d %H:%M:%S %z"
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
 
 
 def str2date(string: str) -> datetime:
-    return datetime.strptime(string, date_format)
+    """
+    Parse a date printed by git with --date iso (e.g. 2017-03-23 17:30:56 +0100),
+    slicing its fixed-width fields instead of using strptime when possible
+    """
+    if len(string) != 25:
+        return datetime.strptime(string, date_format)
+    return datetime(int(string[0:4]), int(string[5:7]), int(string[8:10]),
+                    int(string[11:13]), int(string[14:16]), int(string[17:19]),
+                    tzinfo=utc_offset2tz(string[20:]))
+
+
+def isostr2date(string: str) -> datetime:
+    """
+    Parse a strict ISO 8601 date, as printed by git with %aI (e.g. 2017-03-23T17:30:56+01:00)
+    """
+    return datetime(int(string[0:4]), int(string[5:7]), int(string[8:10]),
+                    int(string[11:13]), int(string[14:16]), int(string[17:19]),
+                    tzinfo=utc_offset2tz(string[19:]))
+
+
+def isostr2timestamp(string: str) -> Tuple[int, int]:
+    """
+    Parse a strict ISO 8601 date into an epoch timestamp and a UTC offset in seconds, without building a datetime
+    """
+    days = date(int(string[0:4]), int(string[5:7]), int(string[8:10])).toordinal() - EPOCH_ORDINAL
+    seconds = int(string[11:13]) * 3600 + int(string[14:16]) * 60 + int(string[17:19])
+    utc_offset = utc_offset2seconds(string[19:])
+    return days * 86400 + seconds - utc_offset, utc_offset
+
+
+@lru_cache(maxsize=None)
+def utc_offset2seconds(offset: str) -> int:
+    sign = -1 if offset[0] == '-' else 1
+    return sign * (int(offset[1:3]) * 3600 + int(offset[-2:]) * 60)
+
+
+@lru_cache(maxsize=None)
+def utc_offset2tz(offset: str) -> timezone:
+    return utc_offset_seconds2tz(utc_offset2seconds(offset))
+
+
+@lru_cache(maxsize=None)
+def utc_offset_seconds2tz(offset: int) -> timezone:
+    return timezone(timedelta(seconds=offset))
+
+
+def timestamp2date(timestamp: int, utc_offset: int) -> datetime:
+    return datetime.fromtimestamp(timestamp, utc_offset_seconds2tz(utc_offset))
+
+
+def date2timestamp(dt: datetime) -> int:
+    return int(dt.timestamp())
 
 
 def date2str(dt: datetime) -> str:
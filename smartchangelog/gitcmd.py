@@ -1,7 +1,15 @@
+import asyncio
+import codecs
 import subprocess
 import os
+import tempfile
 
-from typing import cast, List
+from typing import cast, AsyncGenerator, Callable, List, NamedTuple, Optional, Tuple, Iterator, Iterable
+
+FIELD_SEPARATOR = '\x1f'
+RECORD_SEPARATOR = '\x00'
+LOG_FORMAT = FIELD_SEPARATOR.join(('%H', '%P', '%aN', '%aE', '%aI', '%B'))
+BUFFER_SIZE = 64 * 1024
 
 
 class GitCmdError(Exception):
@@ -10,18 +18,213 @@ class GitCmdError(Exception):
     """
 
 
-def git_command(*git_args: str) -> str:
+class LogRecord(NamedTuple):
+    id: str
+    parents: Tuple[str, ...]
+    author: str
+    email: str
+    date: str
+    message: str
+
+    @classmethod
+    def parse(cls, record: str) -> 'LogRecord':
+        commit_id, parents, author, email, date, message = record.split(FIELD_SEPARATOR, maxsplit=5)
+        return cls(
+            id=commit_id,
+            parents=tuple(parents.split()),
+            author=author,
+            email=email,
+            date=date,
+            message=message
+        )
+
+
+class TagRef(NamedTuple):
+    name: str
+    commit: str
+    timestamp: int
+
+
+class LogFilter(NamedTuple):
+    """
+    Commit filters applied by git log: author and grep are regular expressions (any grep pattern matching a line
+    of the message), since and until are dates, paths limit the commits to the ones touching them
+    """
+    author: str = None
+    since: str = None
+    until: str = None
+    grep: Tuple[str, ...] = ()
+    paths: Tuple[str, ...] = ()
+
+    def options(self) -> List[str]:
+        options = []
+        if self.author:
+            options.append("--author=" + self.author)
+        if self.since:
+            options.append("--since=" + self.since)
+        if self.until:
+            options.append("--until=" + self.until)
+        options += ["--grep=" + pattern for pattern in self.grep]
+        return options
+
+
+def git_command(*git_args: str, cwd: str = None) -> str:
     args = ['git'] + cast(List[str], list(git_args))
-    cp = subprocess.run(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    cp = subprocess.run(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE, cwd=cwd)
     if cp.returncode == 0 and len(cp.stderr) == 0:
         return cp.stdout.decode('utf-8').strip('\n')
     else:
         raise GitCmdError(cp.stderr.decode('utf-8').strip('\n'))
 
 
-def is_inside_work_tree() -> bool:
+class RecordSplitter:
+    """
+    Incremental utf-8 decoding and splitting of a byte stream on separator: only the new chunk is scanned,
+    the incomplete last record is kept as a list of parts, so a record spanning many chunks costs linear time
+    """
+
+    def __init__(self, separator: str) -> None:
+        self.separator = separator
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+        self.pending: List[str] = []
+
+    def feed(self, chunk: bytes, final: bool = False) -> List[str]:
+        """
+        Complete records ending in chunk
+        """
+        *records, tail = self.decoder.decode(chunk, final).split(self.separator)
+        if records:
+            records[0] = ''.join(self.pending) + records[0]
+            self.pending = []
+        if tail:
+            self.pending.append(tail)
+        return records
+
+    def rest(self) -> str:
+        """
+        Last record, not followed by separator
+        """
+        return ''.join(self.pending)
+
+
+def iter_git_command(*git_args: str, separator: str = RECORD_SEPARATOR, stdin_data: str = None,
+                     on_read: Callable[[int], None] = None, cwd: str = None) -> Iterator[str]:
+    """
+    Run a git command (in cwd, the current directory by default) and yield its output split on separator,
+    as git emits it.
+    Only one record is buffered at a time. If the consumer stops early, git is killed.
+    on_read is called with the size in bytes of each chunk read from git.
+    """
+    args = ['git'] + cast(List[str], list(git_args))
+    with tempfile.TemporaryFile() as stderr, tempfile.TemporaryFile() as stdin:
+        if stdin_data is not None:
+            stdin.write(stdin_data.encode('utf-8'))
+            stdin.seek(0)
+        process = subprocess.Popen(args, stdin=stdin, stdout=subprocess.PIPE, stderr=stderr, cwd=cwd)
+        splitter = RecordSplitter(separator)
+        completed = False
+        try:
+            for chunk in iter(lambda: process.stdout.read1(BUFFER_SIZE), b''):
+                if on_read is not None:
+                    on_read(len(chunk))
+                yield from splitter.feed(chunk)
+            yield from splitter.feed(b'', final=True)
+            completed = True
+        finally:
+            process.stdout.close()
+            if not completed:
+                process.kill()
+            returncode = process.wait()
+        stderr.seek(0)
+        error = stderr.read()
+    if returncode != 0 or len(error) > 0:
+        raise GitCmdError(error.decode('utf-8').strip('\n'))
+    pending = splitter.rest().strip('\n')
+    if pending:
+        yield pending
+
+
+async def async_git_command(*git_args: str, cwd: str = None) -> str:
+    """
+    Asynchronous git_command: if it is cancelled (e.g. on timeout), git is killed
+    """
+    process = await asyncio.create_subprocess_exec('git', *git_args, stdout=subprocess.PIPE,
+                                                   stderr=subprocess.PIPE, cwd=cwd)
     try:
-        result = git_command('rev-parse', '--is-inside-work-tree')
+        stdout, stderr = await process.communicate()
+    except BaseException:
+        await kill(process)
+        raise
+    if process.returncode == 0 and len(stderr) == 0:
+        return stdout.decode('utf-8').strip('\n')
+    else:
+        raise GitCmdError(stderr.decode('utf-8').strip('\n'))
+
+
+async def async_iter_git_command(*git_args: str, separator: str = RECORD_SEPARATOR, stdin_data: str = None,
+                                 on_read: Callable[[int], None] = None, cwd: str = None) -> AsyncGenerator[str, None]:
+    """
+    Asynchronous iter_git_command: records are yielded as git emits them, and git is killed if the consumer
+    stops early (the generator is closed) or is cancelled
+    """
+    process = await asyncio.create_subprocess_exec(
+        'git', *git_args, stdin=subprocess.PIPE if stdin_data is not None else subprocess.DEVNULL,
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, cwd=cwd)
+    stderr_task = asyncio.ensure_future(process.stderr.read())
+    stdin_task = asyncio.ensure_future(write_stdin(process, stdin_data)) if stdin_data is not None else None
+    splitter = RecordSplitter(separator)
+    completed = False
+    try:
+        while True:
+            chunk = await process.stdout.read(BUFFER_SIZE)
+            if not chunk:
+                break
+            if on_read is not None:
+                on_read(len(chunk))
+            for record in splitter.feed(chunk):
+                yield record
+        for record in splitter.feed(b'', final=True):
+            yield record
+        if stdin_task is not None:
+            await stdin_task
+        error = await stderr_task
+        returncode = await process.wait()
+        completed = True
+    finally:
+        if not completed:
+            for task in (stdin_task, stderr_task):
+                if task is not None:
+                    task.cancel()
+            await kill(process)
+    if returncode != 0 or len(error) > 0:
+        raise GitCmdError(error.decode('utf-8').strip('\n'))
+    pending = splitter.rest().strip('\n')
+    if pending:
+        yield pending
+
+
+async def write_stdin(process: asyncio.subprocess.Process, stdin_data: str) -> None:
+    try:
+        process.stdin.write(stdin_data.encode('utf-8'))
+        await process.stdin.drain()
+        process.stdin.close()
+    except (BrokenPipeError, ConnectionResetError):
+        # git exited early, its error is read from stderr
+        pass
+
+
+async def kill(process: asyncio.subprocess.Process) -> None:
+    if process.returncode is None:
+        try:
+            process.kill()
+        except ProcessLookupError:
+            pass
+    await asyncio.shield(process.wait())
+
+
+def is_inside_work_tree(cwd: str = None) -> bool:
+    try:
+        result = git_command('rev-parse', '--is-inside-work-tree', cwd=cwd)
         return result == 'true'
     except GitCmdError:
         return False
@@ -35,9 +238,131 @@ def get_gitdir() -> str:
         raise GitCmdError("You have to be inside a git work tree")
 
 
+def get_common_gitdir(cwd: str = None) -> str:
+    """
+    Absolute path of the git directory shared by all the work trees of the repository
+    (.git is a file in a linked work tree or in a submodule)
+    """
+    if is_inside_work_tree(cwd):
+        path = git_command('rev-parse', '--git-common-dir', cwd=cwd)
+        return os.path.abspath(os.path.join(cwd or os.getcwd(), path))
+    else:
+        raise GitCmdError("You have to be inside a git work tree")
+
+
 def log(revision_range: str) -> str:
     return git_command("log", revision_range, "--date", "iso")
 
 
+def structured_log(revision_range: str) -> List[LogRecord]:
+    return list(iter_log(revision_range))
+
+
+def iter_log(revision_range: str = None, max_count: int = None,
+             revisions: Iterable[str] = None, no_merges: bool = False,
+             on_read: Callable[[int], None] = None, cwd: str = None, tags: bool = False,
+             log_filter: LogFilter = None) -> Iterator[LogRecord]:
+    """
+    Yield the commits of revision_range (and of every tag with tags) kept by log_filter, or only the given
+    revisions (in the same order) if any
+    """
+    args, stdin_data = log_args(revision_range, max_count, revisions, no_merges, tags, log_filter)
+    for record in iter_git_command(*args, stdin_data=stdin_data, on_read=on_read, cwd=cwd):
+        if record:
+            yield LogRecord.parse(record)
+
+
+def log_args(revision_range: str = None, max_count: int = None, revisions: Iterable[str] = None,
+             no_merges: bool = False, tags: bool = False,
+             log_filter: LogFilter = None) -> Tuple[List[str], Optional[str]]:
+    """
+    Arguments and standard input of the git log command of iter_log
+    """
+    args = ["log", "-z", "--format=" + LOG_FORMAT]
+    stdin_data = None
+    if max_count is not None:
+        args.append("--max-count={max_count}".format(max_count=max_count))
+    if no_merges:
+        args.append("--no-merges")
+    if tags:
+        args.append("--tags")
+    if log_filter is not None:
+        args += log_filter.options()
+    if revisions is not None:
+        args += ["--no-walk=unsorted", "--stdin"]
+        stdin_data = "\n".join(revisions) + "\n"
+    if revision_range:
+        args.append(revision_range)
+    if log_filter is not None and log_filter.paths:
+        args += ["--"] + list(log_filter.paths)
+    return args, stdin_data
+
+
+async def async_iter_log(revision_range: str = None, max_count: int = None,
+                         revisions: Iterable[str] = None, no_merges: bool = False,
+                         on_read: Callable[[int], None] = None, cwd: str = None,
+                         log_filter: LogFilter = None) -> AsyncGenerator[LogRecord, None]:
+    """
+    Asynchronous iter_log
+    """
+    args, stdin_data = log_args(revision_range, max_count, revisions, no_merges, log_filter=log_filter)
+    records = async_iter_git_command(*args, stdin_data=stdin_data, on_read=on_read, cwd=cwd)
+    try:
+        async for record in records:
+            if record:
+                yield LogRecord.parse(record)
+    finally:
+        # Kill git now if the consumer stopped early, not when the generator is garbage collected
+        await records.aclose()
+
+
+def rev_list(revision_range: str = None, exclude: str = None, cwd: str = None,
+             merges: bool = False) -> Iterator[str]:
+    """
+    Yield the commit ids of revision_range except the ones of exclude (and its ancestors),
+    only the merge commits with merges
+    """
+    args = ["rev-list", revision_range or "HEAD"]
+    if exclude:
+        args.append("^" + exclude)
+    if merges:
+        args.append("--merges")
+    for commit_id in iter_git_command(*args, separator="\n", cwd=cwd):
+        if commit_id:
+            yield commit_id
+
+
+def rev_parse(revision: str, cwd: str = None) -> str:
+    return git_command("rev-parse", "--verify", "--quiet", revision + "^{commit}", cwd=cwd)
+
+
+def is_ancestor(ancestor: str, descendant: str) -> bool:
+    try:
+        git_command("merge-base", "--is-ancestor", ancestor, descendant)
+        return True
+    except GitCmdError:
+        return False
+
+
 def tag() -> List[str]:
     return git_command("tag").split("\n")
+
+
+def tag_refs(cwd: str = None) -> List[TagRef]:
+    """
+    Tags pointing (directly or through annotated tags) to commits, with the commit they point to
+    and their creation date (tagger date, or commit date of lightweight tags), read in a single git command
+    """
+    fields = ('%(refname:short)', '%(objecttype)', '%(objectname)', '%(*objecttype)', '%(*objectname)',
+              '%(creatordate:unix)')
+    output = git_command("for-each-ref", "--format=" + FIELD_SEPARATOR.join(fields), "refs/tags", cwd=cwd)
+    tag_refs = []
+    for line in output.split("\n"):
+        if not line:
+            continue
+        name, object_type, object_name, peeled_type, peeled_name, timestamp = line.split(FIELD_SEPARATOR)
+        if object_type == 'commit':
+            tag_refs.append(TagRef(name=name, commit=object_name, timestamp=int(timestamp or 0)))
+        elif peeled_type == 'commit':
+            tag_refs.append(TagRef(name=name, commit=peeled_name, timestamp=int(timestamp or 0)))
+    return tag_refs
@@ -7,14 +7,20 @@ hooks_path = os.path.join(git_path, 'hooks')
 commitmsg_hook_path = os.path.join(hooks_path, 'commit-msg')
 
 
-def install():
+def install(client=False):
     check_git_path()
     if not os.path.isdir(hooks_path):
         os.makedirs(hooks_path, mode=0o755, exist_ok=True)
     uninstall()
-    commitmsg_script_path = shutil.which('commit-msg')
+    commitmsg_script_path = shutil.which('commit-msg-hook')
     assert commitmsg_script_path
-    os.symlink(commitmsg_script_path, commitmsg_hook_path)
+    if client:
+        from smartchangelog.daemon import client_script
+        with open(commitmsg_hook_path, mode='w') as hook_file:
+            hook_file.write(client_script(fallback_hook_path=commitmsg_script_path))
+        os.chmod(commitmsg_hook_path, 0o755)
+    else:
+        os.symlink(commitmsg_script_path, commitmsg_hook_path)
     assert os.path.exists(commitmsg_hook_path)
     return commitmsg_hook_path
 
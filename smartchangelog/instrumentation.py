@@ -0,0 +1,120 @@
+"""
+Per-stage timing of a changelog run.
+
+Stages are timed with Instrumentation.stage (a context manager) or Instrumentation.iterate (for lazy iterables,
+such as git log records, whose time is only spent when they are consumed). The time of a stage does not include
+the time of the stages timed inside it. Each finished stage is passed to the listeners, to forward the metrics
+to some other telemetry.
+"""
+
+import sys
+import time
+from contextlib import contextmanager
+
+from typing import Callable, Iterable, Iterator, List, IO, Optional, TypeVar
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None
+
+T = TypeVar('T')
+
+
+class Stage:
+    __slots__ = ('name', 'seconds', 'count', 'nested_seconds')
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.seconds = 0.0
+        self.count: Optional[int] = None
+        self.nested_seconds = 0.0
+
+    def __repr__(self) -> str:
+        return "Stage(name={name!r}, seconds={seconds!r}, count={count!r})".format(
+            name=self.name, seconds=self.seconds, count=self.count)
+
+
+Listener = Callable[[Stage], None]
+
+
+def peak_rss() -> Optional[int]:
+    """
+    Peak resident set size in bytes of this process and of its finished children (git), None if unknown
+    """
+    if resource is None:
+        return None
+    rss = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+              resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # bytes on macOS, kilobytes elsewhere
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+class Instrumentation:
+    def __init__(self, listeners: Iterable[Listener] = ()) -> None:
+        self.stages: List[Stage] = []
+        self.listeners: List[Listener] = list(listeners)
+        self.bytes_read = 0
+        self._running: List[Stage] = []
+
+    def add_listener(self, listener: Listener) -> None:
+        self.listeners.append(listener)
+
+    def on_read(self, nbytes: int) -> None:
+        self.bytes_read += nbytes
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[Stage]:
+        stage = Stage(name)
+        self._running.append(stage)
+        start = time.perf_counter()
+        try:
+            yield stage
+        finally:
+            elapsed = time.perf_counter() - start
+            self._running.pop()
+            self._add_nested(elapsed)
+            stage.seconds = elapsed - stage.nested_seconds
+            self._finish(stage)
+
+    def iterate(self, name: str, iterable: Iterable[T]) -> Iterator[T]:
+        """
+        Yield the items of iterable, timing only the time spent producing them, and counting them
+        """
+        stage = Stage(name)
+        stage.count = 0
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                break
+            finally:
+                elapsed = time.perf_counter() - start
+                stage.seconds += elapsed
+                self._add_nested(elapsed)
+            stage.count += 1
+            yield item
+        self._finish(stage)
+
+    def _add_nested(self, seconds: float) -> None:
+        if self._running:
+            self._running[-1].nested_seconds += seconds
+
+    def _finish(self, stage: Stage) -> None:
+        self.stages.append(stage)
+        for listener in self.listeners:
+            listener(stage)
+
+    def write_summary(self, file: IO) -> None:
+        for stage in self.stages:
+            count = '' if stage.count is None else " {count:>10} commits".format(count=stage.count)
+            print("{name:10} {seconds:9.3f} s{count}".format(name=stage.name, seconds=stage.seconds, count=count),
+                  file=file)
+        print("{name:10} {seconds:9.3f} s".format(name='total', seconds=sum(stage.seconds for stage in self.stages)),
+              file=file)
+        print("bytes read: {bytes_read}".format(bytes_read=self.bytes_read), file=file)
+        rss = peak_rss()
+        if rss is not None:
+            print("peak RSS: {rss:.1f} MiB".format(rss=rss / (1 << 20)), file=file)
@@ -0,0 +1,162 @@
+"""
+Changelog of several repositories.
+
+The git log of every repository runs concurrently in a pool of threads, each one streaming the records of its
+repository in batches through a bounded queue. Records are parsed into one CommitTable, repository after
+repository in the given order, as they arrive, while the following git logs are still running: a repository
+that is not parsed yet only holds a few batches, its git log waiting for them to be consumed.
+Each commit knows its repository (the repository directory name, see repository_names), which can be used
+as a grouping criterion.
+"""
+
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from typing import Collection, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Union
+
+from smartchangelog.changelog import chunk_records
+from smartchangelog.commit import Commit
+from smartchangelog.committable import CommitTable
+from smartchangelog.gitcmd import GitCmdError, LogFilter, LogRecord, iter_log
+
+"""Maximum number of git log commands running at once"""
+MAX_WORKERS = 16
+
+"""Number of records passed at once from a git log thread to the parsing thread"""
+BATCH_SIZE = 256
+
+"""Maximum number of record batches of a repository waiting to be parsed"""
+MAX_PENDING_BATCHES = 8
+
+"""Seconds between two checks that the parsing thread still wants the records of a repository"""
+PUT_TIMEOUT = 0.1
+
+
+class RepositoryRange(NamedTuple):
+    path: str
+    revision_range: Optional[str] = None
+
+    @classmethod
+    def parse(cls, spec: str) -> 'RepositoryRange':
+        """
+        Parse PATH[:RANGE], e.g. ../api:v1.0..v2.0: the range follows the last colon, unless spec is a directory
+        """
+        if os.path.isdir(spec):
+            return cls(path=spec)
+        path, separator, revision_range = spec.rpartition(':')
+        if not separator:
+            return cls(path=spec)
+        return cls(path=path, revision_range=revision_range or None)
+
+
+def repository_names(repositories: Sequence[RepositoryRange]) -> List[str]:
+    """
+    Name of each repository: its directory name, or its shortest path suffix telling it apart from the other
+    repositories of the same directory name (e.g. team-a/api and team-b/api), followed by its range
+    if the repository is given several times.
+    Raise ValueError if a repository is given several times with the same range.
+    """
+    specs = [(os.path.abspath(repository.path), repository.revision_range) for repository in repositories]
+    duplicates = sorted({path for path, revision_range in specs if specs.count((path, revision_range)) > 1})
+    if duplicates:
+        raise ValueError("repositories given several times with the same range: {paths}".format(
+            paths=', '.join(duplicates)))
+    paths = [path for path, _ in specs]
+    names = []
+    for path, revision_range in specs:
+        parts = path.split(os.sep)
+        depth = 1
+        while any(other != path and other.split(os.sep)[-depth:] == parts[-depth:] for other in paths):
+            depth += 1
+        name = '/'.join(parts[-depth:])
+        if paths.count(path) > 1:
+            name = '{name}:{range}'.format(name=name, range=revision_range or 'HEAD')
+        names.append(name)
+    return names
+
+
+class LogStream:
+    """
+    Records of one repository, read by a git log thread (read) and consumed by the parsing thread (iteration)
+    """
+
+    def __init__(self, repository: RepositoryRange, log_filter: LogFilter = None) -> None:
+        self.repository = repository
+        self.log_filter = log_filter
+        self.batches: queue.Queue = queue.Queue(maxsize=MAX_PENDING_BATCHES)
+        self.closed = threading.Event()
+
+    def read(self) -> None:
+        if self.closed.is_set():
+            return
+        try:
+            records = iter_log(revision_range=self.repository.revision_range, cwd=self.repository.path,
+                               log_filter=self.log_filter)
+            try:
+                for batch in chunk_records(records, BATCH_SIZE):
+                    if not self.put(batch):
+                        return
+            finally:
+                records.close()
+        except (GitCmdError, OSError) as e:
+            self.put(GitCmdError("{path}: {error}".format(path=self.repository.path, error=e)))
+            return
+        except Exception as e:
+            self.put(e)
+            return
+        self.put(None)
+
+    def put(self, item: Union[List[LogRecord], Exception, None]) -> bool:
+        """
+        Wait for room in the queue to put item, return False if the stream was closed meanwhile
+        """
+        while not self.closed.is_set():
+            try:
+                self.batches.put(item, timeout=PUT_TIMEOUT)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def close(self) -> None:
+        self.closed.set()
+
+    def __iter__(self) -> Iterator[LogRecord]:
+        while True:
+            item = self.batches.get()
+            if item is None:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield from item
+
+
+def changelog(repositories: Sequence[RepositoryRange], max_workers: int = MAX_WORKERS,
+              log_filter: LogFilter = None, types: Collection[str] = None) -> CommitTable:
+    """
+    Commits of repositories kept by log_filter, only the ones of one of types (type names) if any.
+    Raise ValueError if a repository is given several times with the same range.
+    """
+    names = repository_names(repositories)
+    table = CommitTable()
+    streams = [LogStream(repository, log_filter) for repository in repositories]
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(repositories)))) as executor:
+        for stream in streams:
+            executor.submit(stream.read)
+        try:
+            for stream, name in zip(streams, names):
+                append_records(table, stream, name, types)
+        finally:
+            for stream in streams:
+                stream.close()
+    return table
+
+
+def append_records(table: CommitTable, records: Iterable[LogRecord], repository: str,
+                   types: Collection[str] = None) -> None:
+    for record in records:
+        header = Commit.parse_header(record.message)
+        if types is None or CommitTable.has_type(header, types):
+            table.append_record(record, repository=repository, header=header)
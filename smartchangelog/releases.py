@@ -0,0 +1,236 @@
+"""
+Changelog sectioned by release.
+
+Tags are resolved to their commits with a single git for-each-ref, and the history of HEAD and of every tag is
+read with a single git log. Each commit belongs to the first release containing it: releases are visited
+in ancestry order of their tags (a tag before the tags of its descendant commits, unrelated tags by creation
+date), each taking the commits reachable from its tag that no previous release took, with a breadth-first walk
+of the parents stopping at commits already taken. Tags are ordered with a single pass over the commits, parents
+first, each commit inheriting the nearest tagged ancestors of its parents. Commits of no release are "unreleased".
+
+Past release sections do not change, so their markdown can be cached: see write_report.
+"""
+
+import hashlib
+import heapq
+from collections import deque
+from io import StringIO
+
+from typing import Dict, FrozenSet, IO, Iterable, List, NamedTuple, Set, Tuple, cast
+
+from smartchangelog import __version__, gitcmd
+from smartchangelog.cache import CommitCache
+from smartchangelog.changelog import Changelog, Node
+from smartchangelog.commit import Commit
+from smartchangelog.commitmsg import CommitMsg
+from smartchangelog.committable import CommitTable
+from smartchangelog.gitcmd import LogRecord, TagRef
+
+UNRELEASED = 'unreleased'
+
+"""Version of the rendered release sections, to increment when the markdown layout changes"""
+FRAGMENT_VERSION = 2
+
+
+class ReleaseChangelog(NamedTuple):
+    """
+    Commits with their release, and release names from the newest one (unreleased first)
+    """
+    commits: CommitTable
+    releases: Tuple[str, ...]
+
+
+def tag_order(tag_ref: TagRef) -> Tuple[int, str]:
+    return tag_ref.timestamp, tag_ref.name
+
+
+def assign_releases(records: Iterable[LogRecord], tag_refs: Iterable[TagRef]) -> Tuple[Dict[str, str], List[str]]:
+    """
+    Release of each commit id, and releases from the first one (of several tags pointing to the same commit,
+    only the oldest one is a release: the other ones would be empty)
+    """
+    parents = {record.id: record.parents for record in records}
+    tags_by_commit: Dict[str, List[TagRef]] = {}
+    for tag_ref in sorted(tag_refs, key=tag_order):
+        if tag_ref.commit in parents:
+            tags_by_commit.setdefault(tag_ref.commit, []).append(tag_ref)
+    releases: Dict[str, str] = {}
+    ordered_releases: List[str] = []
+    for tag_commit in release_order(parents, tags_by_commit):
+        tag_name = tags_by_commit[tag_commit][0].name
+        ordered_releases.append(tag_name)
+        releases[tag_commit] = tag_name
+        pending = deque((tag_commit,))
+        while pending:
+            for parent in parents[pending.popleft()]:
+                if parent in parents and parent not in releases:
+                    releases[parent] = tag_name
+                    pending.append(parent)
+    return releases, ordered_releases
+
+
+def release_order(parents: Dict[str, Tuple[str, ...]], tags_by_commit: Dict[str, List[TagRef]]) -> List[str]:
+    """
+    Tagged commits, each one after its tagged ancestors, unrelated ones by the date (then name) of their oldest tag
+    """
+    nb_ancestors: Dict[str, int] = {}
+    descendants: Dict[str, List[str]] = {tag_commit: [] for tag_commit in tags_by_commit}
+    # Nearest tagged commits among each commit and its ancestors, shared with its parents when they are the same
+    nearest_tags: Dict[str, FrozenSet[str]] = {}
+    no_tags: FrozenSet[str] = frozenset()
+    for commit in topological_order(parents):
+        nearest_ancestors = no_tags
+        for parent in parents[commit]:
+            parent_tags = nearest_tags.get(parent, no_tags)
+            if not parent_tags <= nearest_ancestors:
+                nearest_ancestors = parent_tags if not nearest_ancestors else nearest_ancestors | parent_tags
+        if commit in tags_by_commit:
+            nb_ancestors[commit] = len(nearest_ancestors)
+            for ancestor in nearest_ancestors:
+                descendants[ancestor].append(commit)
+            nearest_tags[commit] = frozenset((commit,))
+        else:
+            nearest_tags[commit] = nearest_ancestors
+    ready = [(tag_order(tags_by_commit[tag_commit][0]), tag_commit)
+             for tag_commit, count in nb_ancestors.items() if count == 0]
+    heapq.heapify(ready)
+    order: List[str] = []
+    while ready:
+        _, tag_commit = heapq.heappop(ready)
+        order.append(tag_commit)
+        for descendant in descendants[tag_commit]:
+            nb_ancestors[descendant] -= 1
+            if nb_ancestors[descendant] == 0:
+                heapq.heappush(ready, (tag_order(tags_by_commit[descendant][0]), descendant))
+    return order
+
+
+def topological_order(parents: Dict[str, Tuple[str, ...]]) -> List[str]:
+    """
+    Commits of parents, each one after its parents (parents missing from parents are ignored)
+    """
+    order: List[str] = []
+    visited: Set[str] = set()
+    for root in parents:
+        if root in visited:
+            continue
+        visited.add(root)
+        stack = [(root, iter(parents[root]))]
+        while stack:
+            commit, pending_parents = stack[-1]
+            for parent in pending_parents:
+                if parent in parents and parent not in visited:
+                    visited.add(parent)
+                    stack.append((parent, iter(parents[parent])))
+                    break
+            else:
+                stack.pop()
+                order.append(commit)
+    return order
+
+
+class ReleaseHistory(NamedTuple):
+    """
+    Commits read from git, release of each commit id, release names from the newest one (unreleased first),
+    and a key of each tagged release identifying its section: the names and commits of its tag and of the
+    previous tags
+    """
+    records: List[LogRecord]
+    releases: Dict[str, str]
+    ordered_releases: Tuple[str, ...]
+    keys: Dict[str, str]
+
+
+def read_history(revision: str = None, cwd: str = None) -> ReleaseHistory:
+    """
+    History of revision (HEAD by default) and of every tag
+    """
+    tag_refs = gitcmd.tag_refs(cwd=cwd)
+    records = list(gitcmd.iter_log(revision_range=revision or 'HEAD', tags=True, cwd=cwd))
+    releases, ordered_releases = assign_releases(records, tag_refs)
+    tag_commits = {tag_ref.name: tag_ref.commit for tag_ref in tag_refs}
+    keys: Dict[str, str] = {}
+    hash_object = hashlib.sha1()
+    for release in ordered_releases:
+        hash_object.update("{name}\0{commit}\n".format(name=release, commit=tag_commits[release]).encode('utf-8'))
+        keys[release] = hash_object.hexdigest()
+    return ReleaseHistory(records=records, releases=releases,
+                          ordered_releases=(UNRELEASED,) + tuple(reversed(ordered_releases)), keys=keys)
+
+
+def changelog(revision: str = None, cwd: str = None, history: ReleaseHistory = None,
+              excluded_releases: Iterable[str] = ()) -> ReleaseChangelog:
+    """
+    Commits of revision (HEAD by default) and of every tag, with their release, except the ones of
+    excluded_releases
+    """
+    history = history or read_history(revision, cwd)
+    excluded_releases = set(excluded_releases)
+    table = CommitTable()
+    for record in history.records:
+        release = history.releases.get(record.id, UNRELEASED)
+        if release not in excluded_releases:
+            table.append_record(record, release=release)
+    return ReleaseChangelog(commits=table, releases=history.ordered_releases)
+
+
+def group(release_changelog: ReleaseChangelog, *criteria: property) -> Node:
+    """
+    One group per release (newest first), commits being grouped by criteria inside each release
+    """
+    commits_by_release: Dict[str, List] = {release: [] for release in release_changelog.releases}
+    for commit in release_changelog.commits.views():
+        commits_by_release[commit.release].append(commit)
+    children = []
+    for release in release_changelog.releases:
+        commits = commits_by_release[release]
+        if commits:
+            release_node = Changelog.group(commits, *criteria, pack=release_changelog.commits.pack)
+            if release_node.commits is not None:
+                children.append(Node(name=release, criterion=Commit.release, commits=release_node.commits))
+            else:
+                children.append(Node(name=release, criterion=Commit.release, children=release_node.children))
+    return Node(children=cast(Tuple[Node], tuple(children)))
+
+
+def fragment_key(release_key: str, criteria: Tuple[property, ...], stats: bool) -> str:
+    """
+    Cache key of the markdown section of a release
+    """
+    key = (
+        FRAGMENT_VERSION,
+        __version__,
+        release_key,
+        tuple(Commit.property_name(criterion) for criterion in criteria),
+        tuple(str(commit_type) for commit_type in CommitMsg.TYPES),
+        stats
+    )
+    return 'release:' + hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+
+
+def write_report(history: ReleaseHistory, criteria: Tuple[property, ...], file: IO, stats: bool = False,
+                 cache: CommitCache = None) -> None:
+    """
+    Write the markdown report of the releases (as Node.write does), reusing the sections of tagged releases found
+    in cache and storing the other ones. The unreleased section is always rendered.
+    """
+    cached_fragments: Dict[str, str] = {}
+    if cache is not None:
+        for release in history.ordered_releases[1:]:
+            fragment = cache.get_fragment(fragment_key(history.keys[release], criteria, stats))
+            if fragment is not None:
+                cached_fragments[release] = fragment
+    root = group(changelog(history=history, excluded_releases=cached_fragments), *criteria)
+    release_nodes = {node.name: node for node in root.children}
+    for release in history.ordered_releases:
+        if release in cached_fragments:
+            file.write(cached_fragments[release])
+        elif release in release_nodes:
+            if cache is None or release == UNRELEASED:
+                root.write_child(release_nodes[release], file=file, stats=stats)
+            else:
+                sio = StringIO()
+                root.write_child(release_nodes[release], file=sio, stats=stats)
+                fragment = sio.getvalue()
+                cache.put_fragment(fragment_key(history.keys[release], criteria, stats), fragment)
+                file.write(fragment)
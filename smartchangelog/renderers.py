@@ -0,0 +1,138 @@
+import json
+from abc import ABC, abstractmethod
+
+from typing import Any, Dict, IO, List, Tuple, Type
+
+from smartchangelog.changelog import Node
+from smartchangelog.commit import Commit
+
+
+class Renderer(ABC):
+    """
+    Output format of a grouped changelog: writes the whole tree to a text stream in one walk.
+    With stats, groups come with their commit count and dates.
+    """
+
+    def __init__(self, stats: bool = False) -> None:
+        self.stats = stats
+
+    @abstractmethod
+    def write(self, node: Node, file: IO) -> None:
+        pass
+
+    @classmethod
+    def commit2dict(cls, commit: Commit) -> Dict[str, Any]:
+        return {
+            'id': commit.id,
+            'author': commit.author,
+            'date': commit.date.isoformat(),
+            'type': str(commit.type) if commit.type else None,
+            'scope': commit.scope,
+            'subject': commit.subject,
+            'body': commit.body,
+            'repository': commit.repository,
+            'release': commit.release
+        }
+
+    @classmethod
+    def stats2dict(cls, node: Node) -> Dict[str, Any]:
+        aggregates = node.aggregates()
+        if aggregates is None:
+            return {'count': 0}
+        return {
+            'count': aggregates.nb_commits,
+            'first_date': aggregates.first_date.isoformat(),
+            'last_date': aggregates.last_date.isoformat(),
+            'authors': len(aggregates.authors)
+        }
+
+    @classmethod
+    def criterion_name(cls, node: Node) -> str:
+        return Commit.property_name(node.criterion)
+
+
+class MarkdownRenderer(Renderer):
+    """
+    Markdown report, as printed by the smartchangelog command
+    """
+
+    def write(self, node: Node, file: IO) -> None:
+        node.write(file=file, stats=self.stats)
+        print(file=file)
+
+
+class JsonRenderer(Renderer):
+    """
+    One JSON document: nested groups ({"criterion", "name", ...}) with either "groups" or "commits".
+    With stats, groups also have "count", "first_date", "last_date" and "authors" (number of distinct authors).
+    """
+
+    def write(self, node: Node, file: IO) -> None:
+        self.write_node(node, file)
+        file.write('\n')
+
+    def write_node(self, node: Node, file: IO) -> None:
+        file.write('{')
+        if node.criterion is not None:
+            file.write('"criterion": {criterion}, "name": {name}, '.format(
+                criterion=json.dumps(self.criterion_name(node)), name=json.dumps(node.name)))
+            if self.stats:
+                file.write(json.dumps(self.stats2dict(node))[1:-1] + ', ')
+        commits = node.commits
+        if commits is None and node.children and node.children[0].children is None:
+            commits = [child.value for child in node.children]
+        if commits is not None:
+            file.write('"commits": [')
+            for i, commit in enumerate(commits):
+                if i:
+                    file.write(', ')
+                json.dump(self.commit2dict(commit), file)
+        else:
+            file.write('"groups": [')
+            for i, child in enumerate(node.children or ()):
+                if i:
+                    file.write(', ')
+                self.write_node(child, file)
+        file.write(']}')
+
+
+class JsonLinesRenderer(Renderer):
+    """
+    One JSON object per line and per commit, with the names of its groups in "groups"
+    """
+
+    def write(self, node: Node, file: IO) -> None:
+        self.write_node(node, [], file)
+
+    def write_node(self, node: Node, groups: List[Tuple[str, str]], file: IO) -> None:
+        if node.commits is not None:
+            for commit in node.commits:
+                line = self.commit2dict(commit)
+                line['groups'] = dict(groups)
+                file.write(json.dumps(line) + '\n')
+            return
+        if node.children is None:
+            line = self.commit2dict(node.value)
+            line['groups'] = dict(groups)
+            file.write(json.dumps(line) + '\n')
+            return
+        for child in node.children:
+            if child.criterion is not None:
+                self.write_node(child, groups + [(self.criterion_name(child), child.name)], file)
+            else:
+                self.write_node(child, groups, file)
+
+
+RENDERERS: Dict[str, Type[Renderer]] = {
+    'markdown': MarkdownRenderer,
+    'json': JsonRenderer,
+    'jsonl': JsonLinesRenderer,
+}
+
+
+def register(name: str, renderer: Type[Renderer]) -> None:
+    RENDERERS[name] = renderer
+
+
+def get(name: str, stats: bool = False) -> Renderer:
+    return RENDERERS[name](stats=stats)
@@ -0,0 +1,291 @@
+"""
+Commit message rules of a repository.
+
+They are read from a .smartchangelog.toml file, or from the [tool.smartchangelog] section of a pyproject.toml file,
+in the current directory or the nearest of its parents (up to the top of the git work tree):
+
+    firstline_pattern = '^([a-z]+)(?:\\(([^\\n\\t]+)\\))?: (.+)$'
+    firstline_max_length = 72
+    body_max_length = 100
+    type_order = ['feat', 'fix']
+
+    [types]
+    perf = 'performance improvement'
+    ci = 'changes to the continuous integration configuration'
+
+pyproject.toml files without [tool.smartchangelog] section, or that are not valid TOML, are ignored.
+Reading TOML requires Python 3.11 or the toml package: without them, pyproject.toml files are ignored too,
+while a .smartchangelog.toml file is an error.
+The rules read from a file are cached on disk as JSON, keyed by the path, modification time and SHA-256 hash
+of the file content, so hooks do not parse TOML again on every commit. Reading JSON cannot run code, so a tampered
+cache can only change the rules, like the rules file itself.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+import zlib
+
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Pattern, Tuple
+
+from smartchangelog import __version__
+from smartchangelog.commitmsg import BaseCommitType, CommitMsg, CommitType, TypeRegistry
+
+CONFIG_FILE_NAMES = ('.smartchangelog.toml', 'pyproject.toml')
+
+"""Keys allowed in a rules file"""
+KEYS = ('firstline_pattern', 'firstline_max_length', 'body_max_length', 'types', 'type_order')
+
+"""Built-in rules"""
+DEFAULT_FIRSTLINE_PATTERN = CommitMsg.FIRSTLINE_PATTERN.pattern
+DEFAULT_FIRSTLINE_MAX_LENGTH = CommitMsg.FIRSTLINE_MAX_LENGTH
+DEFAULT_BODY_MAX_LENGTH = CommitMsg.BODY_MAX_LENGTH
+
+
+"""Rules loaded by this process (e.g. the validation daemon), by rules file path: (cache key, rules)"""
+LOADED_RULES: Dict[str, Tuple[List, Optional['Rules']]] = {}
+
+
+class RulesError(Exception):
+    """
+    Invalid rules file error
+    """
+
+
+class CustomCommitType(BaseCommitType):
+    """
+    Commit type declared in a rules file, ordered after the built-in types
+    """
+    __slots__ = ('name', 'value', 'ordinal')
+
+    def __init__(self, name: str, value: str, ordinal: int) -> None:
+        self.name = name
+        self.value = value
+        self.ordinal = ordinal
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, CustomCommitType):
+            return (self.name, self.value, self.ordinal) == (other.name, other.value, other.ordinal)
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash((self.name, self.value, self.ordinal))
+
+    def __repr__(self) -> str:
+        return "CustomCommitType(name={name!r}, value={value!r}, ordinal={ordinal!r})".format(
+            name=self.name, value=self.value, ordinal=self.ordinal)
+
+
+class Rules(NamedTuple):
+    firstline_pattern: Pattern
+    firstline_max_length: int
+    body_max_length: int
+    types: TypeRegistry
+
+    @classmethod
+    def default(cls) -> 'Rules':
+        return cls(
+            firstline_pattern=re.compile(DEFAULT_FIRSTLINE_PATTERN),
+            firstline_max_length=DEFAULT_FIRSTLINE_MAX_LENGTH,
+            body_max_length=DEFAULT_BODY_MAX_LENGTH,
+            types=TypeRegistry()
+        )
+
+    @classmethod
+    def current(cls) -> 'Rules':
+        """
+        Rules applied to CommitMsg
+        """
+        return cls(
+            firstline_pattern=CommitMsg.FIRSTLINE_PATTERN,
+            firstline_max_length=CommitMsg.FIRSTLINE_MAX_LENGTH,
+            body_max_length=CommitMsg.BODY_MAX_LENGTH,
+            types=CommitMsg.TYPES
+        )
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'Rules':
+        unknown_keys = sorted(set(config) - set(KEYS))
+        if unknown_keys:
+            raise RulesError("unknown keys: {keys}".format(keys=', '.join(unknown_keys)))
+        try:
+            firstline_pattern = re.compile(config.get('firstline_pattern', DEFAULT_FIRSTLINE_PATTERN))
+        except (re.error, TypeError) as e:
+            raise RulesError("invalid firstline_pattern: {error}".format(error=e))
+        if firstline_pattern.groups != 3:
+            raise RulesError("firstline_pattern must have 3 groups: type, scope and subject")
+        firstline_max_length = cls.positive_int(config, 'firstline_max_length', DEFAULT_FIRSTLINE_MAX_LENGTH)
+        body_max_length = cls.positive_int(config, 'body_max_length', DEFAULT_BODY_MAX_LENGTH)
+        extra_types = config.get('types', {})
+        if not isinstance(extra_types, dict) or not all(isinstance(doc, str) for doc in extra_types.values()):
+            raise RulesError("types must be a table of type descriptions")
+        builtin_types = [name for name in extra_types if name in CommitType.__members__]
+        if builtin_types:
+            raise RulesError("types already defined: {names}".format(names=', '.join(builtin_types)))
+        type_order = config.get('type_order', [])
+        if not isinstance(type_order, list):
+            raise RulesError("type_order must be a list of types")
+        types = tuple(CommitType) + tuple(CustomCommitType(name=name, value=doc, ordinal=ordinal)
+                                          for ordinal, (name, doc) in enumerate(extra_types.items(), len(CommitType)))
+        try:
+            registry = TypeRegistry(types, type_order)
+        except ValueError as e:
+            raise RulesError("type_order: {error}".format(error=e))
+        return cls(
+            firstline_pattern=firstline_pattern,
+            firstline_max_length=firstline_max_length,
+            body_max_length=body_max_length,
+            types=registry
+        )
+
+    @classmethod
+    def positive_int(cls, config: Dict[str, Any], key: str, default: int) -> int:
+        value = config.get(key, default)
+        if not isinstance(value, int) or isinstance(value, bool) or value <= 0:
+            raise RulesError("{key} must be a positive integer".format(key=key))
+        return value
+
+    @classmethod
+    def load(cls, directory: str = None) -> 'Rules':
+        """
+        Rules of the repository containing directory (the current directory by default),
+        the default rules if there is no rules file
+        """
+        for config_path in find_configs(directory):
+            if is_pyproject(config_path) and not toml_available():
+                continue
+            rules = cls.load_file(config_path)
+            if rules is not None:
+                return rules
+        return cls.default()
+
+    @classmethod
+    def load_file(cls, config_path: str) -> Optional['Rules']:
+        """
+        Rules of a rules file (None for a pyproject.toml file without rules), from the cache if it is up to date
+        """
+        with open(config_path, 'rb') as config_file:
+            content = config_file.read()
+            mtime_ns = os.fstat(config_file.fileno()).st_mtime_ns
+        key = [__version__, config_path, mtime_ns, hashlib.sha256(content).hexdigest()]
+        loaded_key, rules = LOADED_RULES.get(config_path, (None, None))
+        if loaded_key == key:
+            return rules
+        config = load_cached_config(config_path, content, key)
+        rules = None
+        if config is not None:
+            try:
+                rules = cls.from_config(config)
+            except RulesError as e:
+                raise RulesError("{path}: {error}".format(path=config_path, error=e))
+        LOADED_RULES[config_path] = (key, rules)
+        return rules
+
+    def apply(self) -> None:
+        """
+        Use these rules to validate and parse commit messages
+        """
+        CommitMsg.FIRSTLINE_PATTERN = self.firstline_pattern
+        CommitMsg.FIRSTLINE_MAX_LENGTH = self.firstline_max_length
+        CommitMsg.BODY_MAX_LENGTH = self.body_max_length
+        CommitMsg.TYPES = self.types
+
+
+def find_configs(directory: str = None) -> Iterator[str]:
+    """
+    Yield the rules file candidates from directory up to the top of the git work tree, nearest first
+    """
+    directory = os.path.abspath(directory or os.getcwd())
+    while True:
+        for name in CONFIG_FILE_NAMES:
+            path = os.path.join(directory, name)
+            if os.path.isfile(path):
+                yield path
+        parent = os.path.dirname(directory)
+        if parent == directory or os.path.exists(os.path.join(directory, '.git')):
+            return
+        directory = parent
+
+
+def is_pyproject(config_path: str) -> bool:
+    return os.path.basename(config_path) == 'pyproject.toml'
+
+
+def toml_available() -> bool:
+    if sys.version_info >= (3, 11):
+        return True
+    import importlib.util
+    return importlib.util.find_spec('toml') is not None
+
+
+def load_cached_config(config_path: str, content: bytes, key: List) -> Optional[Dict[str, Any]]:
+    """
+    Rules read from content, the content of config_path, from the cache if its key is key
+    """
+    path = cache_path(config_path)
+    try:
+        with open(path, encoding='utf-8') as cache_file:
+            cached = json.load(cache_file)
+        if cached['key'] == key:
+            return cached['config']
+    except (OSError, ValueError, KeyError, TypeError):
+        # Missing, outdated or unreadable cache
+        pass
+    config = read_config(config_path, content)
+    try:
+        data = json.dumps({'key': key, 'config': config})
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = "{path}.{pid}".format(path=path, pid=os.getpid())
+        with open(tmp_path, 'w', encoding='utf-8') as cache_file:
+            cache_file.write(data)
+        os.replace(tmp_path, path)
+    except (OSError, TypeError, ValueError):
+        # Not cached, e.g. a TOML date (which from_config rejects anyway)
+        pass
+    return config
+
+
+def read_config(config_path: str, content: bytes) -> Optional[Dict[str, Any]]:
+    """
+    Rules of a rules file, None for a pyproject.toml file without rules
+    """
+    try:
+        config = parse_toml(config_path, content)
+    except ValueError as e:
+        if is_pyproject(config_path):
+            return None
+        raise RulesError("{path}: {error}".format(path=config_path, error=e))
+    if is_pyproject(config_path):
+        tool = config.get('tool', {})
+        if not isinstance(tool, dict) or 'smartchangelog' not in tool:
+            return None
+        config = tool['smartchangelog']
+    return config
+
+
+def cache_path(config_path: str) -> str:
+    cache_dir = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    # The cached key also holds the path, so a crc32 collision only costs a cache miss
+    name = '{crc:08x}'.format(crc=zlib.crc32(config_path.encode('utf-8')))
+    return os.path.join(cache_dir, 'smartchangelog', 'rules', name)
+
+
+def parse_toml(path: str, content: bytes) -> Dict[str, Any]:
+    """
+    Parse content, the content of the TOML file path, with tomllib (Python 3.11+) or the toml package.
+    Raise ValueError if it is not valid TOML.
+    """
+    try:
+        import tomllib
+    except ImportError:
+        pass
+    else:
+        return tomllib.loads(content.decode('utf-8'))
+    try:
+        import toml
+    except ImportError:
+        raise RulesError("reading {path} requires the toml package (pip install smartchangelog[toml])".format(
+            path=path))
+    return toml.loads(content.decode('utf-8'))
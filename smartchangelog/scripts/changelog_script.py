@@ -1,9 +1,19 @@
 import argparse
+import cProfile
+import sys
 
-from smartchangelog.gitcmd import log
+from typing import Optional, Tuple
+
+from smartchangelog.gitcmd import LogFilter, iter_log
 from smartchangelog import __version__
-from smartchangelog.changelog import Changelog
+from smartchangelog.cache import CommitCache
 from smartchangelog.commit import Commit
+from smartchangelog.commitmsg import CommitMsg
+from smartchangelog.committable import CommitTable
+from smartchangelog import multirepo, releases
+from smartchangelog import renderers
+from smartchangelog.instrumentation import Instrumentation
+from smartchangelog.rules import DEFAULT_FIRSTLINE_PATTERN, Rules, RulesError
 
 
 def main() -> None:
@@ -14,22 +24,146 @@ def main() -> None:
 
     parser.add_argument("-r", "--range", help="revision range (in the same meaning than git log command)")
     parser.add_argument("-g", "--groupby", help="list of criteria", nargs="*")
+    parser.add_argument("-c", "--cache", help="reuse and store parsed commits in .git/smartchangelog/cache "
+                                              "(with --by-release, rendered markdown release sections)",
+                        action="store_true")
+    parser.add_argument("-i", "--incremental", help="only read the commits added since the previous run "
+                                                    "on the same range (implies --cache)", action="store_true")
+    parser.add_argument("--repo", help="repository (and revision range) of a multi-repository changelog, "
+                                       "repeat it for each repository", metavar="PATH[:RANGE]", action="append",
+                        type=multirepo.RepositoryRange.parse)
+    parser.add_argument("--by-release", help="one section per tag, from the newest one, with the commits of HEAD "
+                                             "not yet released first", action="store_true")
+    parser.add_argument("--author", help="only the commits of authors matching AUTHOR (a git log regular expression "
+                                         "on \"name <email>\")")
+    parser.add_argument("--since", help="only the commits more recent than SINCE (a git log date)")
+    parser.add_argument("--until", help="only the commits older than UNTIL (a git log date)")
+    parser.add_argument("--type", help="only the commits of this type, repeat it for each type", dest="types",
+                        metavar="TYPE", action="append")
+    parser.add_argument("paths", help="only the commits touching these paths (git log pathspecs, after --)",
+                        nargs="*")
+    parser.add_argument("-j", "--jobs", help="number of processes parsing commits", type=int, default=1)
+    parser.add_argument("-f", "--format", help="output format", choices=sorted(renderers.RENDERERS),
+                        default="markdown")
+    parser.add_argument("-s", "--stats", help="show the commit count and the months of each group",
+                        action="store_true")
+    parser.add_argument("-t", "--timings", help="print the time spent in each stage on stderr", action="store_true")
+    parser.add_argument("-p", "--profile", help="dump cProfile statistics to PROFILE (pstats format)")
 
     args = parser.parse_args()
 
-    gitlog = log(revision_range=args.range)
+    if args.repo and (args.range or args.cache or args.incremental):
+        parser.error("--repo can not be used with --range, --cache or --incremental")
+    if args.by_release and (args.repo or args.range or args.incremental):
+        parser.error("--by-release can not be used with --repo, --range or --incremental")
+    if args.jobs != 1 and (args.repo or args.by_release):
+        parser.error("--jobs can not be used with --repo or --by-release")
+    if args.repo:
+        try:
+            multirepo.repository_names(args.repo)
+        except ValueError as e:
+            parser.error(str(e))
+    filtered = args.author or args.since or args.until or args.types or args.paths
+    if filtered and (args.by_release or args.cache or args.incremental):
+        parser.error("--author, --since, --until, --type and paths can not be used with --by-release, --cache "
+                     "or --incremental")
+
+    try:
+        Rules.load().apply()
+    except RulesError as e:
+        parser.error(str(e))
+    if args.types:
+        unknown_types = [name for name in args.types if name not in CommitMsg.TYPES.by_name]
+        if unknown_types:
+            parser.error("unknown types: {names}".format(names=', '.join(unknown_types)))
 
-    changelog = Changelog.parse(gitlog)
+    instrumentation = Instrumentation()
+    profile = cProfile.Profile() if args.profile else None
+    if profile:
+        profile.enable()
 
     if args.groupby:
         criteria = tuple((Commit.property(criterion) for criterion in args.groupby))
     else:
         criteria = ()
 
-    node = changelog.groupby(*criteria)
-    print(node.report())
+    if args.by_release and args.cache and args.format == 'markdown':
+        write_cached_release_report(criteria, args.stats, instrumentation)
+    else:
+        write_report(args, criteria, instrumentation)
+
+    if profile:
+        profile.disable()
+        profile.dump_stats(args.profile)
+    if args.timings:
+        sys.stdout.flush()
+        instrumentation.write_summary(file=sys.stderr)
     exit(0)
 
 
+def write_cached_release_report(criteria: Tuple[property, ...], stats: bool, instrumentation: Instrumentation) -> None:
+    """
+    Markdown report by release, with the sections of past releases taken from the cache
+    """
+    with instrumentation.stage('parse') as stage:
+        history = releases.read_history()
+        stage.count = len(history.records)
+    with instrumentation.stage('render') as stage, CommitCache() as cache:
+        releases.write_report(history, criteria, file=sys.stdout, stats=stats, cache=cache)
+        print()
+        stage.count = len(history.records)
+
+
+def log_filter(args: argparse.Namespace) -> Optional[LogFilter]:
+    """
+    Filters of args done by git log. Types are looked for with a grep on the start of the message lines,
+    which only selects candidates (any line may match), so the first line of each commit is still checked:
+    see CommitTable.from_records. The grep is left out with a custom first line pattern, where the type
+    may not start the line.
+    """
+    if not (args.author or args.since or args.until or args.types or args.paths):
+        return None
+    grep: Tuple[str, ...] = ()
+    if args.types and CommitMsg.FIRSTLINE_PATTERN.pattern == DEFAULT_FIRSTLINE_PATTERN:
+        grep = tuple('^' + name for name in args.types)
+    return LogFilter(author=args.author, since=args.since, until=args.until, grep=grep, paths=tuple(args.paths))
+
+
+def write_report(args: argparse.Namespace, criteria: Tuple[property, ...], instrumentation: Instrumentation) -> None:
+    if args.by_release:
+        with instrumentation.stage('parse') as stage:
+            release_changelog = releases.changelog()
+            changelog = release_changelog.commits
+            stage.count = len(changelog)
+    elif args.repo:
+        with instrumentation.stage('parse') as stage:
+            changelog = multirepo.changelog(args.repo, log_filter=log_filter(args), types=args.types)
+            stage.count = len(changelog)
+    elif args.incremental:
+        with instrumentation.stage('cache') as stage, CommitCache() as cache:
+            changelog = cache.incremental_changelog(revision_range=args.range, jobs=args.jobs)
+            stage.count = len(changelog)
+    elif args.cache:
+        with instrumentation.stage('cache') as stage, CommitCache() as cache:
+            changelog = cache.changelog(revision_range=args.range, jobs=args.jobs)
+            stage.count = len(changelog)
+    else:
+        with instrumentation.stage('parse') as stage:
+            records = iter_log(revision_range=args.range, on_read=instrumentation.on_read, log_filter=log_filter(args))
+            changelog = CommitTable.from_records(instrumentation.iterate('git log', records), jobs=args.jobs,
+                                                 types=args.types)
+            stage.count = len(changelog)
+
+    with instrumentation.stage('group') as stage:
+        if args.by_release:
+            node = releases.group(release_changelog, *criteria)
+        else:
+            node = changelog.groupby(*criteria)
+        stage.count = len(changelog)
+    with instrumentation.stage('render') as stage:
+        renderers.get(args.format, stats=args.stats).write(node, file=sys.stdout)
+        stage.count = len(changelog)
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Lean git commit hook:
+ .git/hooks/commit-msg
+
+Only the commit message validator is imported, the help is only built on error.
+"""
+
+import sys
+
+from smartchangelog.commitmsg import CommitMsg, CommitSyntaxError
+from smartchangelog.rules import Rules, RulesError
+
+
+def main() -> None:
+    if len(sys.argv) != 2:
+        print("usage: {prog} COMMIT_MSG_FILE".format(prog=sys.argv[0]), file=sys.stderr)
+        sys.exit(2)
+    msg = sys.argv[1]
+    if "COMMIT_EDITMSG" in msg:
+        with open(msg) as msg_file:
+            msg = msg_file.read()
+    try:
+        Rules.load().apply()
+    except RulesError as e:
+        print(e, file=sys.stderr)
+        sys.exit(2)
+    try:
+        CommitMsg.parse(msg)
+    except CommitSyntaxError as e:
+        print("{error}\n\n{help}".format(error=e, help=CommitMsg.help()), file=sys.stderr)
+        sys.exit(1)
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,16 +5,26 @@ Git commit hook:
 """
 
 import argparse
+import sys
 
 from smartchangelog.commitmsg import CommitMsg, CommitSyntaxError
+from smartchangelog.rules import Rules, RulesError
 from smartchangelog import __version__
-from smartchangelog.githook import install, uninstall
+
+
+class ArgumentParser(argparse.ArgumentParser):
+    """
+    Argument parser building the commit message help only when it is displayed
+    """
+
+    def format_help(self) -> str:
+        self.epilog = CommitMsg.help()
+        return super().format_help()
 
 
 def main() -> None:
-    parser = argparse.ArgumentParser(description="Git commit message checker",
-                                     formatter_class=argparse.RawDescriptionHelpFormatter,
-                                     epilog=CommitMsg.help())
+    parser = ArgumentParser(description="Git commit message checker",
+                            formatter_class=argparse.RawDescriptionHelpFormatter)
     parser.add_argument("-v", "--version", help="print commit-msg version number", action="version",
                         version=__version__)
 
@@ -22,17 +32,53 @@ def main() -> None:
     group.add_argument("msg", help="the commit message to check", nargs="?")
     group.add_argument("-i", "--install_hook", action="store_true")
     group.add_argument("-u", "--uninstall_hook", action="store_true")
+    group.add_argument("-r", "--range", help="check every non-merge commit message of a revision range "
+                                             "(e.g. in a pre-receive hook)")
+    group.add_argument("--stdin", help="check NUL-separated commit messages read from stdin", action="store_true")
+    group.add_argument("--daemon", help="run the validation daemon used by hooks installed with --client",
+                       action="store_true")
+    parser.add_argument("--client", help="with -i, install a hook asking the validation daemon first",
+                        action="store_true")
 
     args = parser.parse_args()
 
+    if args.client and not args.install_hook:
+        parser.error("--client can only be used with -i")
+
+    if not (args.install_hook or args.uninstall_hook):
+        try:
+            Rules.load().apply()
+        except RulesError as e:
+            parser.error(str(e))
+
     if args.install_hook:
-        hook_path = install()
+        from smartchangelog.githook import install
+        hook_path = install(client=args.client)
         if hook_path:
             print("commit-msg hook installed in {path}".format(path=hook_path))
     elif args.uninstall_hook:
+        from smartchangelog.githook import uninstall
         hook_path = uninstall()
         if hook_path:
             print("commit-msg hook removed from {path}".format(path=hook_path))
+    elif args.daemon:
+        from smartchangelog.daemon import default_socket_path, serve
+        print("commit-msg validation daemon listening on {path}".format(path=default_socket_path()), flush=True)
+        serve()
+    elif args.range or args.stdin:
+        if args.range:
+            from smartchangelog.gitcmd import iter_log
+            messages = ((record.id, record.message) for record in iter_log(args.range, no_merges=True))
+        else:
+            messages = (("#{index}".format(index=index), msg)
+                        for index, msg in enumerate(sys.stdin.read().split("\0"), start=1) if msg)
+        violations = 0
+        for violation in CommitMsg.validate_all(messages):
+            violations += 1
+            print("{id}: {error}".format(id=violation.id, error=violation.error), file=sys.stderr)
+        if violations:
+            parser.exit(1, "{count} invalid commit message(s)\n\n{help}\n".format(count=violations,
+                                                                                   help=CommitMsg.help()))
     else:
         msg = args.msg
         if "COMMIT_EDITMSG" in msg:
@@ -0,0 +1,124 @@
+import os
+
+import pytest
+
+from smartchangelog.cache import CommitCache
+from smartchangelog.changelog import Changelog
+from smartchangelog.gitcmd import git_command, iter_log, get_gitdir
+# noinspection PyUnresolvedReferences
+from tests.integration import temp_dir
+
+
+@pytest.mark.usefixtures("temp_dir")
+def test_changelog_with_cache():
+    # GIVEN
+    git_command('commit', '--allow-empty', '-m', 'feat(ui): first')
+    with CommitCache() as cache:
+        cache.changelog('HEAD')
+    git_command('commit', '--allow-empty', '-m', 'fix(ui): second\n\nbody')
+    expected = Changelog.from_records(iter_log('HEAD'))
+    # WHEN
+    with CommitCache() as cache:
+        changelog = cache.changelog('HEAD')
+    # THEN
+    assert changelog == expected
+    assert os.path.isfile(os.path.join(get_gitdir(), 'smartchangelog', 'cache'))
+
+
+@pytest.mark.usefixtures("temp_dir")
+def test_incremental_changelog():
+    # GIVEN
+    git_command('commit', '--allow-empty', '-m', 'feat(ui): first')
+    git_command('commit', '--allow-empty', '-m', 'feat(ui): second')
+    with CommitCache() as cache:
+        cache.incremental_changelog()
+    git_command('commit', '--allow-empty', '-m', 'fix(ui): third')
+    expected = Changelog.from_records(iter_log('HEAD'))
+    # WHEN
+    with CommitCache() as cache:
+        changelog = cache.incremental_changelog()
+    # THEN
+    assert changelog == expected
+
+
+@pytest.mark.usefixtures("temp_dir")
+def test_incremental_changelog_with_rewritten_history():
+    # GIVEN
+    git_command('commit', '--allow-empty', '-m', 'feat(ui): first')
+    git_command('commit', '--allow-empty', '-m', 'feat(ui): second')
+    with CommitCache() as cache:
+        cache.incremental_changelog()
+    git_command('commit', '--amend', '--allow-empty', '-m', 'fix(ui): second')
+    expected = Changelog.from_records(iter_log('HEAD'))
+    # WHEN
+    with CommitCache() as cache:
+        changelog = cache.incremental_changelog()
+    # THEN
+    assert changelog == expected
+
+
+def test_changelog_with_cache_in_linked_work_tree(temp_dir):
+    # GIVEN
+    git_command('commit', '--allow-empty', '-m', 'feat(ui): first')
+    work_tree = os.path.join(temp_dir, 'work-tree')
+    git_command('worktree', 'add', '--quiet', '-b', 'feature', work_tree)
+    os.chdir(work_tree)
+    expected = Changelog.from_records(iter_log('HEAD'))
+    # WHEN
+    with CommitCache() as cache:
+        changelog = cache.changelog('HEAD')
+    # THEN
+    assert changelog == expected
+    assert os.path.isfile(os.path.join(temp_dir, '.git', 'smartchangelog', 'cache'))
+
+
+@pytest.mark.usefixtures("temp_dir")
+def test_incremental_changelog_with_moved_range_start():
+    # GIVEN
+    git_command('commit', '--allow-empty', '-m', 'feat(ui): first')
+    git_command('branch', 'main')
+    git_command('checkout', '--quiet', '-b', 'feature')
+    git_command('commit', '--allow-empty', '-m', 'feat(ui): f1')
+    git_command('commit', '--allow-empty', '-m', 'feat(ui): f2')
+    with CommitCache() as cache:
+        cache.incremental_changelog('main..feature')
+    git_command('branch', '--force', 'main', 'feature')
+    git_command('commit', '--allow-empty', '-m', 'feat(ui): f3')
+    # WHEN
+    with CommitCache() as cache:
+        changelog = cache.incremental_changelog('main..feature')
+    # THEN
+    assert [commit.subject for commit in changelog] == ['f3']
+
+
+@pytest.mark.usefixtures("temp_dir")
+def test_incremental_changelog_with_merge():
+    # GIVEN
+    git_command('commit', '--allow-empty', '-m', 'feat(ui): first')
+    git_command('checkout', '--quiet', '-b', 'side')
+    git_command('commit', '--allow-empty', '-m', 'Side commit', '--date', '2001-01-01T00:00:00')
+    git_command('checkout', '--quiet', '-')
+    git_command('commit', '--allow-empty', '-m', 'feat(ui): second')
+    with CommitCache() as cache:
+        cache.incremental_changelog()
+    git_command('merge', '--quiet', '--no-ff', '-m', 'Merge side', 'side')
+    expected = Changelog.from_records(iter_log('HEAD'))
+    # WHEN
+    with CommitCache() as cache:
+        changelog = cache.incremental_changelog()
+    # THEN
+    assert changelog == expected
+
+
+@pytest.mark.usefixtures("temp_dir")
+def test_incremental_changelog_with_git_log_options():
+    # GIVEN
+    git_command('commit', '--allow-empty', '-m', 'feat(ui): first')
+    git_command('commit', '--allow-empty', '-m', 'fix(ui): second')
+    expected = Changelog.from_records(iter_log('--since=2000-01-01'))
+    # WHEN
+    with CommitCache() as cache:
+        changelog = cache.incremental_changelog('--since=2000-01-01')
+    # THEN
+    assert len(changelog) == 2
+    assert changelog == expected
@@ -52,6 +52,16 @@ def test_version_arg():
     assert version == expected_version
 
 
+@pytest.mark.parametrize('option', ['--by-release', '--repo=.'])
+def test_jobs_arg_with_option(option: str):
+    # GIVEN
+    with set_args(changelog_script_path, '--jobs', '2', option), pytest.raises(SystemExit) as e:
+        # WHEN
+        changelog_script.main()
+    # THEN
+    assert e.value.code == 2
+
+
 # Tools
 def revision_range() -> str:
     tags = tag()
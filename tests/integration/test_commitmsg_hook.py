@@ -0,0 +1,61 @@
+import inspect
+import os
+
+import pytest
+
+from smartchangelog.commitmsg import CommitMsg
+from smartchangelog.scripts import commitmsg_hook
+from smartchangelog.tools import set_args, set_commit_editmsg
+
+"""Path of the file containing commitmsg_hook.py file"""
+commitmsg_hook_path = inspect.getfile(commitmsg_hook)
+
+
+def test_right_msg_file():
+    # GIVEN
+    with set_commit_editmsg('feat(ui): add button') as f, \
+            set_args(commitmsg_hook_path, f.name), \
+            pytest.raises(SystemExit) as e:
+        # WHEN
+        commitmsg_hook.main()
+    # THEN
+    assert e.value.code == 0
+
+
+def test_wrong_msg_file():
+    # GIVEN
+    with set_commit_editmsg('bad format') as f, \
+            set_args(commitmsg_hook_path, f.name) as result, \
+            pytest.raises(SystemExit) as e:
+        # WHEN
+        commitmsg_hook.main()
+    stdout, stderr = result
+    # THEN
+    assert e.value.code != 0
+    assert "Allowed <type> values" in stderr.read()
+
+
+def test_without_msg_arg():
+    # GIVEN
+    with set_args(commitmsg_hook_path), pytest.raises(SystemExit) as e:
+        # WHEN
+        commitmsg_hook.main()
+    # THEN
+    assert e.value.code == 2
+
+
+def test_msg_file_with_rules_file(tmpdir, monkeypatch):
+    # GIVEN
+    for name in ('FIRSTLINE_PATTERN', 'FIRSTLINE_MAX_LENGTH', 'BODY_MAX_LENGTH', 'TYPES'):
+        monkeypatch.setattr(CommitMsg, name, getattr(CommitMsg, name))
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmpdir.join('cache')))
+    tmpdir.mkdir('.git')
+    tmpdir.join('.smartchangelog.toml').write("[types]\nperf = 'performance improvement'\n")
+    monkeypatch.chdir(str(tmpdir))
+    with set_commit_editmsg('perf(parser): faster') as f, \
+            set_args(commitmsg_hook_path, os.path.abspath(f.name)), \
+            pytest.raises(SystemExit) as e:
+        # WHEN
+        commitmsg_hook.main()
+    # THEN
+    assert e.value.code == 0
@@ -1,8 +1,11 @@
+import io
+
 import pytest
 
 import smartchangelog.scripts.commitmsg_script
 from smartchangelog.tools import set_args, set_commit_editmsg, commitmsg_script_path
 from smartchangelog import githook
+from smartchangelog.gitcmd import git_command
 # noinspection PyUnresolvedReferences
 from tests.integration import temp_dir
 
@@ -96,4 +99,39 @@ def test_uninstall_arg():
     assert uninstall_msg == 'commit-msg hook removed from .git/hooks/commit-msg'
 
 
+def test_client_arg_without_install():
+    # GIVEN
+    with set_args(commitmsg_script_path, "--client", 'feat(ui): add button'), pytest.raises(SystemExit) as e:
+        # WHEN
+        smartchangelog.scripts.commitmsg_script.main()
+    # THEN
+    assert e.value.code == 2
+
 
+@pytest.mark.usefixtures("temp_dir")
+def test_range_arg():
+    # GIVEN
+    git_command('commit', '--allow-empty', '-m', 'feat(ui): add button')
+    git_command('commit', '--allow-empty', '-m', 'wrong commit message')
+    bad_commit_id = git_command('rev-parse', 'HEAD')
+    with set_args(commitmsg_script_path, "--range", "HEAD") as result, pytest.raises(SystemExit) as e:
+        # WHEN
+        smartchangelog.scripts.commitmsg_script.main()
+    stdout, stderr = result
+    errors = stderr.read()
+    # THEN
+    assert e.value.code == 1
+    assert errors.startswith(bad_commit_id + ": ")
+    assert "1 invalid commit message(s)" in errors
+
+
+def test_stdin_arg(monkeypatch):
+    # GIVEN
+    monkeypatch.setattr('sys.stdin', io.StringIO('feat(ui): add button\n\0wrong commit message\n\0'))
+    with set_args(commitmsg_script_path, "--stdin") as result, pytest.raises(SystemExit) as e:
+        # WHEN
+        smartchangelog.scripts.commitmsg_script.main()
+    stdout, stderr = result
+    # THEN
+    assert e.value.code == 1
+    assert stderr.read().startswith("#2: ")
@@ -0,0 +1,145 @@
+import os
+import socket
+import stat
+import subprocess
+import threading
+import time
+
+import pytest
+
+from smartchangelog import daemon
+
+
+@pytest.fixture(scope='function')
+def socket_path(tmpdir):
+    path = os.path.join(str(tmpdir), 'daemon.sock')
+    thread = threading.Thread(target=daemon.serve, args=(path,), daemon=True)
+    thread.start()
+    for _ in range(100):
+        if daemon.is_running(path):
+            break
+        time.sleep(0.01)
+    yield path
+
+
+def test_validate_with_right_msg(socket_path):
+    # GIVEN
+    msg = 'feat(ui): add button\n'
+    # WHEN
+    error = daemon.validate(msg, socket_path)
+    # THEN
+    assert error is None
+
+
+def test_validate_with_wrong_msg(socket_path):
+    # GIVEN
+    msg = 'wrong commit message\n'
+    # WHEN
+    error = daemon.validate(msg, socket_path)
+    # THEN
+    assert error.startswith("wrong commit message doesn't follow the first line commit message pattern")
+
+
+def test_validate_with_repository_rules(socket_path, tmpdir, monkeypatch):
+    # GIVEN
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmpdir.join('cache')))
+    repository = tmpdir.mkdir('repository')
+    repository.mkdir('.git')
+    repository.join('.smartchangelog.toml').write("[types]\nperf = 'performance improvement'\n")
+    msg = 'perf(parser): faster\n'
+    # WHEN
+    error = daemon.validate(msg, socket_path, directory=str(repository))
+    other_error = daemon.validate(msg, socket_path, directory=str(tmpdir.mkdir('other')))
+    # THEN
+    assert error is None
+    assert other_error.startswith("perf is not an available commit type")
+
+
+def test_validate_without_daemon(tmpdir):
+    # GIVEN
+    path = os.path.join(str(tmpdir), 'none.sock')
+    # WHEN
+    with pytest.raises(OSError):
+        daemon.validate('feat(ui): add button', path)
+        # THEN
+        pass
+
+
+def test_handle_non_utf8_msg(socket_path):
+    # GIVEN
+    request = b'\0feat(ui): add \xff button\n'
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socket_path)
+        # WHEN
+        client.sendall(request)
+        client.shutdown(socket.SHUT_WR)
+        response = b''.join(iter(lambda: client.recv(65536), b''))
+    # THEN
+    assert response == b'OK\n'
+
+
+def test_client_script_with_empty_response(tmpdir):
+    # GIVEN
+    path = os.path.join(str(tmpdir), 'broken.sock')
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    server.listen(1)
+
+    def reply_nothing():
+        connection, _ = server.accept()
+        with connection:
+            b''.join(iter(lambda: connection.recv(65536), b''))
+
+    thread = threading.Thread(target=reply_nothing, daemon=True)
+    thread.start()
+    fallback_hook = tmpdir.join('fallback-hook')
+    fallback_hook.write('#!/bin/sh\nexit 3\n')
+    fallback_hook.chmod(0o755)
+    client_hook = tmpdir.join('commit-msg')
+    client_hook.write(daemon.client_script(fallback_hook_path=str(fallback_hook), socket_path=path))
+    client_hook.chmod(0o755)
+    msg_file = tmpdir.join('COMMIT_EDITMSG')
+    msg_file.write('feat(ui): add button\n')
+    # WHEN
+    returncode = subprocess.call([str(client_hook), str(msg_file)])
+    # THEN
+    assert returncode == 3
+    server.close()
+
+
+def test_default_socket_path_without_runtime_dir(tmpdir, monkeypatch):
+    # GIVEN
+    monkeypatch.delenv('XDG_RUNTIME_DIR', raising=False)
+    monkeypatch.setattr('tempfile.tempdir', str(tmpdir))
+    # WHEN
+    path = daemon.default_socket_path()
+    # THEN
+    directory = os.path.dirname(path)
+    assert os.path.dirname(directory) == str(tmpdir)
+    assert stat.S_IMODE(os.stat(directory).st_mode) == 0o700
+
+
+def test_default_socket_path_with_shared_dir(tmpdir, monkeypatch):
+    # GIVEN
+    monkeypatch.delenv('XDG_RUNTIME_DIR', raising=False)
+    monkeypatch.setattr('tempfile.tempdir', str(tmpdir))
+    tmpdir.mkdir('smartchangelog-{uid}'.format(uid=os.getuid())).chmod(0o777)
+    # WHEN
+    with pytest.raises(PermissionError):
+        daemon.default_socket_path()
+        # THEN
+        pass
+
+
+@pytest.mark.skipif(os.getuid() != 0, reason="changing the owner of a file requires root")
+def test_serve_with_socket_of_other_user(tmpdir):
+    # GIVEN
+    path = tmpdir.join('other.sock')
+    path.write('')
+    os.chown(str(path), 12345, 12345)
+    # WHEN
+    with pytest.raises(PermissionError):
+        daemon.serve(str(path))
+        # THEN
+        pass
+    assert path.check()
@@ -0,0 +1,132 @@
+import os
+
+import pytest
+
+from smartchangelog import multirepo
+from smartchangelog.commit import Commit
+from smartchangelog.gitcmd import GitCmdError, LogFilter, git_command
+from smartchangelog.multirepo import RepositoryRange
+
+
+def init_repository(path: str, *messages: str) -> None:
+    os.mkdir(path)
+    git_command('init', cwd=path)
+    git_command('config', 'user.name', 'Nicolas Gouzy', cwd=path)
+    git_command('config', 'user.email', 'nicolas.gouzy@gmail.com', cwd=path)
+    for message in messages:
+        git_command('commit', '--allow-empty', '-m', message, cwd=path)
+
+
+def test_repository_range_parse():
+    # GIVEN
+    # WHEN
+    with_range = RepositoryRange.parse('../api:v1.0..v2.0')
+    without_range = RepositoryRange.parse('../api')
+    # THEN
+    assert with_range == RepositoryRange(path='../api', revision_range='v1.0..v2.0')
+    assert without_range == RepositoryRange(path='../api', revision_range=None)
+
+
+def test_repository_range_parse_with_colon_in_path(tmpdir):
+    # GIVEN
+    path = str(tmpdir.mkdir('team:api'))
+    # WHEN
+    with_range = RepositoryRange.parse(path + ':v1.0..v2.0')
+    without_range = RepositoryRange.parse(path)
+    # THEN
+    assert with_range == RepositoryRange(path=path, revision_range='v1.0..v2.0')
+    assert without_range == RepositoryRange(path=path, revision_range=None)
+
+
+def test_repository_names():
+    # GIVEN
+    repositories = [RepositoryRange(path='/work/team-a/api'), RepositoryRange(path='/work/team-b/api'),
+                    RepositoryRange(path='/work/ui'), RepositoryRange(path='/work/ui', revision_range='v1.0..HEAD')]
+    # WHEN
+    names = multirepo.repository_names(repositories)
+    # THEN
+    assert names == ['team-a/api', 'team-b/api', 'ui:HEAD', 'ui:v1.0..HEAD']
+
+
+def test_repository_names_with_same_repository_twice():
+    # GIVEN
+    repositories = [RepositoryRange(path='/work/api'), RepositoryRange(path='/work/../work/api')]
+    # WHEN
+    with pytest.raises(ValueError):
+        multirepo.repository_names(repositories)
+        # THEN
+        pass
+
+
+def test_changelog(tmpdir):
+    # GIVEN
+    api_path = str(tmpdir.join('api'))
+    ui_path = str(tmpdir.join('ui'))
+    init_repository(api_path, 'feat(model): first', 'fix(model): second')
+    init_repository(ui_path, 'feat(button): third')
+    repositories = [RepositoryRange(path=api_path), RepositoryRange(path=ui_path, revision_range='HEAD')]
+    # WHEN
+    changelog = multirepo.changelog(repositories)
+    node = changelog.groupby(Commit.repository, Commit.type)
+    # THEN
+    assert [commit.subject for commit in changelog] == ['second', 'first', 'third']
+    assert [child.name for child in node.children] == ['api', 'ui']
+    assert [child.name for child in node.children[0].children] == ['feat', 'fix']
+    assert changelog[2].repository == 'ui'
+
+
+def test_changelog_with_log_filter(tmpdir):
+    # GIVEN
+    api_path = str(tmpdir.join('api'))
+    init_repository(api_path, 'feat(model): first', 'fix(model): second', 'Merge fix\n\nfix: not a first line')
+    for path, message in (('service/a', 'fix(service): third'), ('web/b', 'fix(web): fourth'),
+                          ('service/c', 'feat(service): fifth')):
+        tmpdir.join('api', path).write(path, ensure=True)
+        git_command('add', path, cwd=api_path)
+        git_command('commit', '-m', message, cwd=api_path)
+    log_filter = LogFilter(grep=('^fix',), paths=('service',))
+    # WHEN
+    changelog = multirepo.changelog([RepositoryRange(path=api_path)], log_filter=log_filter, types=('fix',))
+    all_fixes = multirepo.changelog([RepositoryRange(path=api_path)], log_filter=LogFilter(grep=('^fix',)),
+                                    types=('fix',))
+    # THEN
+    assert [commit.subject for commit in changelog] == ['third']
+    assert [commit.subject for commit in all_fixes] == ['fourth', 'third', 'second']
+
+
+def test_changelog_with_unknown_repository(tmpdir):
+    # GIVEN
+    repositories = [RepositoryRange(path=str(tmpdir.join('missing')))]
+    # WHEN
+    with pytest.raises(GitCmdError) as e:
+        multirepo.changelog(repositories)
+    # THEN
+    assert 'missing' in str(e.value)
+
+
+def test_changelog_with_small_batches(tmpdir, monkeypatch):
+    # GIVEN
+    monkeypatch.setattr(multirepo, 'BATCH_SIZE', 1)
+    monkeypatch.setattr(multirepo, 'MAX_PENDING_BATCHES', 1)
+    paths = [str(tmpdir.join(name)) for name in ('api', 'ui', 'doc')]
+    for path in paths:
+        init_repository(path, 'feat(model): first', 'fix(model): second', 'docs(model): third')
+    # WHEN
+    changelog = multirepo.changelog([RepositoryRange(path=path) for path in paths], max_workers=2)
+    # THEN
+    assert [commit.repository for commit in changelog] == ['api'] * 3 + ['ui'] * 3 + ['doc'] * 3
+    assert [commit.subject for commit in changelog][:3] == ['third', 'second', 'first']
+
+
+def test_changelog_with_unknown_first_repository(tmpdir, monkeypatch):
+    # GIVEN
+    monkeypatch.setattr(multirepo, 'BATCH_SIZE', 1)
+    monkeypatch.setattr(multirepo, 'MAX_PENDING_BATCHES', 1)
+    api_path = str(tmpdir.join('api'))
+    init_repository(api_path, 'feat(model): first', 'fix(model): second', 'docs(model): third')
+    repositories = [RepositoryRange(path=str(tmpdir.join('missing'))), RepositoryRange(path=api_path)]
+    # WHEN
+    with pytest.raises(GitCmdError) as e:
+        multirepo.changelog(repositories)
+    # THEN
+    assert 'missing' in str(e.value)
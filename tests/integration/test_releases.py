@@ -0,0 +1,85 @@
+from io import StringIO
+
+import pytest
+
+from smartchangelog import releases
+from smartchangelog.cache import CommitCache
+from smartchangelog.commit import Commit
+from smartchangelog.gitcmd import git_command, tag_refs
+# noinspection PyUnresolvedReferences
+from tests.integration import temp_dir
+
+
+@pytest.mark.usefixtures("temp_dir")
+def test_tag_refs():
+    # GIVEN
+    git_command('commit', '--allow-empty', '-m', 'feat(ui): first')
+    head = git_command('rev-parse', 'HEAD')
+    git_command('tag', 'v1')
+    git_command('tag', '-a', 'v1-annotated', '-m', 'annotated')
+    git_command('tag', 'tree', 'HEAD^{tree}')
+    # WHEN
+    refs = tag_refs()
+    # THEN
+    assert sorted((ref.name, ref.commit) for ref in refs) == [('v1', head), ('v1-annotated', head)]
+
+
+@pytest.mark.usefixtures("temp_dir")
+def test_group_by_release():
+    # GIVEN
+    git_command('commit', '--allow-empty', '-m', 'feat(ui): first')
+    git_command('tag', 'v1')
+    git_command('commit', '--allow-empty', '-m', 'fix(ui): second')
+    git_command('commit', '--allow-empty', '-m', 'feat(ui): third')
+    git_command('tag', '-a', 'v2', '-m', 'second release')
+    git_command('commit', '--allow-empty', '-m', 'docs: fourth')
+    # WHEN
+    release_changelog = releases.changelog()
+    node = releases.group(release_changelog, Commit.type)
+    # THEN
+    assert release_changelog.releases == ('unreleased', 'v2', 'v1')
+    assert [child.name for child in node.children] == ['unreleased', 'v2', 'v1']
+    assert [child.name for child in node.children[1].children] == ['feat', 'fix']
+    assert len(node.children[1]) == 2
+    assert node.report().startswith("# release: unreleased\n\n## type: docs\n")
+
+
+@pytest.mark.usefixtures("temp_dir")
+def test_write_report_with_cache():
+    # GIVEN
+    git_command('commit', '--allow-empty', '-m', 'feat(ui): first')
+    git_command('tag', 'v1')
+    git_command('commit', '--allow-empty', '-m', 'fix(ui): second')
+    expected = releases.group(releases.changelog(), Commit.type).report(stats=True)
+    with CommitCache() as cache:
+        releases.write_report(releases.read_history(), (Commit.type,), file=StringIO(), stats=True, cache=cache)
+    history = releases.read_history()
+    output = StringIO()
+    # WHEN
+    with CommitCache() as cache:
+        releases.write_report(history, (Commit.type,), file=output, stats=True, cache=cache)
+        fragment = cache.get_fragment(releases.fragment_key(history.keys['v1'], (Commit.type,), True))
+    # THEN
+    assert output.getvalue() == expected
+    assert fragment.startswith("# release: v1 (1 commit, ")
+
+
+@pytest.mark.usefixtures("temp_dir")
+def test_write_report_with_cache_after_tag_rename():
+    # GIVEN
+    git_command('commit', '--allow-empty', '-m', 'feat(ui): first')
+    git_command('tag', 'v1')
+    git_command('commit', '--allow-empty', '-m', 'fix(ui): second')
+    git_command('tag', 'v2')
+    with CommitCache() as cache:
+        releases.write_report(releases.read_history(), (), file=StringIO(), cache=cache)
+    git_command('tag', 'v2.0', 'v2')
+    git_command('tag', '--delete', 'v2')
+    expected = releases.group(releases.changelog()).report()
+    output = StringIO()
+    # WHEN
+    with CommitCache() as cache:
+        releases.write_report(releases.read_history(), (), file=output, cache=cache)
+    # THEN
+    assert output.getvalue() == expected
+    assert "# release: v2.0" in expected
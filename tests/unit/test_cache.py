@@ -0,0 +1,68 @@
+import os
+
+from smartchangelog import cache
+from smartchangelog.cache import CommitCache
+from smartchangelog.changelog import Changelog
+from tests.unit import data_file_path
+
+
+def changelog() -> Changelog:
+    with open(data_file_path('big.gitlog'), encoding='utf-8') as log_file:
+        return Changelog.parse(log_file.read())
+
+
+class TestCommitCache:
+    def test_put_and_get(self, tmpdir):
+        # GIVEN
+        commits = changelog()
+        path = os.path.join(str(tmpdir), 'cache')
+        with CommitCache(path) as commit_cache:
+            commit_cache.put(commits)
+        # WHEN
+        with CommitCache(path) as commit_cache:
+            cached = commit_cache.get(commit.id for commit in commits)
+        # THEN
+        assert [cached[commit.id] for commit in commits] == commits
+
+    def test_get_with_other_rules(self, tmpdir, monkeypatch):
+        # GIVEN
+        commits = changelog()
+        path = os.path.join(str(tmpdir), 'cache')
+        with CommitCache(path) as commit_cache:
+            commit_cache.put(commits)
+        monkeypatch.setattr(cache, 'SCHEMA_VERSION', cache.SCHEMA_VERSION + 1)
+        # WHEN
+        with CommitCache(path) as commit_cache:
+            cached = commit_cache.get(commit.id for commit in commits)
+        # THEN
+        assert cached == {}
+
+
+class TestFragments:
+    def test_put_and_get_fragment(self, tmpdir):
+        # GIVEN
+        path = os.path.join(str(tmpdir), 'cache')
+        with CommitCache(path) as commit_cache:
+            commit_cache.put_fragment('release:v1', '# release: v1\n\n')
+        # WHEN
+        with CommitCache(path) as commit_cache:
+            fragment = commit_cache.get_fragment('release:v1')
+            missing = commit_cache.get_fragment('release:v2')
+        # THEN
+        assert fragment == '# release: v1\n\n'
+        assert missing is None
+
+    def test_evict_least_recently_used_fragments(self, tmpdir, monkeypatch):
+        # GIVEN
+        monkeypatch.setattr(cache, 'FRAGMENTS_MAX_SIZE', 25)
+        path = os.path.join(str(tmpdir), 'cache')
+        with CommitCache(path) as commit_cache:
+            commit_cache.put_fragment('v1', 'x' * 10)
+            commit_cache.put_fragment('v2', 'x' * 10)
+            commit_cache.get_fragment('v1')
+            # WHEN
+            commit_cache.put_fragment('v3', 'x' * 10)
+            # THEN
+            assert commit_cache.get_fragment('v1') is not None
+            assert commit_cache.get_fragment('v2') is None
+            assert commit_cache.get_fragment('v3') is not None
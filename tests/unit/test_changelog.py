@@ -1,7 +1,14 @@
+import asyncio
+import multiprocessing
+from io import StringIO
+
 from smartchangelog import datetools
+from smartchangelog import changelog as changelog_module
 from smartchangelog.changelog import Changelog, Node
 from smartchangelog.commit import Commit
-from smartchangelog.commitmsg import CommitType
+from smartchangelog.commitmsg import CommitMsg, CommitType, TypeRegistry
+from smartchangelog.gitcmd import LogRecord
+from smartchangelog.rules import Rules
 from tests.unit import data_file_path
 
 
@@ -35,6 +42,57 @@ class TestChangelog:
         assert changelog[0] == expected_commit_with_scope
         assert changelog[1] == expected_commit_without_scope
 
+    def test_parse_with_jobs(self, monkeypatch):
+        # GIVEN
+        with open(data_file_path('big.gitlog'), encoding='utf-8') as log_file:
+            log = log_file.read()
+        monkeypatch.setattr(changelog_module, 'PARSE_CHUNK_SIZE', 4)
+        expected = Changelog.parse(log)
+        # WHEN
+        changelog = Changelog.parse(log, jobs=2)
+        # THEN
+        assert changelog == expected
+
+    def test_from_records_with_jobs_and_spawned_processes(self, monkeypatch):
+        # GIVEN
+        records = [LogRecord(id='{index:040x}'.format(index=index), parents=(), author='Nicolas Gouzy',
+                             email='nicolas.gouzy@gmail.com', date='2017-03-23T17:30:56+01:00',
+                             message='perf(parser): faster {index}\n'.format(index=index)) for index in range(8)]
+        for name in ('FIRSTLINE_PATTERN', 'FIRSTLINE_MAX_LENGTH', 'BODY_MAX_LENGTH', 'TYPES'):
+            monkeypatch.setattr(CommitMsg, name, getattr(CommitMsg, name))
+        Rules.from_config({'types': {'perf': 'performance improvement'}}).apply()
+        monkeypatch.setattr(changelog_module, 'PARSE_CHUNK_SIZE', 4)
+        start_method = multiprocessing.get_start_method()
+        multiprocessing.set_start_method('spawn', force=True)
+        # WHEN
+        try:
+            changelog = Changelog.from_records(records, jobs=2)
+        finally:
+            multiprocessing.set_start_method(start_method, force=True)
+        # THEN
+        assert [str(commit.type) for commit in changelog] == ['perf'] * len(records)
+
+    def test_aparse(self):
+        # GIVEN
+        with open(data_file_path('big.gitlog'), encoding='utf-8') as log_file:
+            log = log_file.read()
+        records = [LogRecord(id=commit.id, parents=(), author=commit.author.split(' <')[0],
+                             email=commit.author.split(' <')[1][:-1], date=commit.date.isoformat(),
+                             message=commit.subject or '') for commit in Changelog.parse(log)]
+
+        async def async_records():
+            for record in records:
+                yield record
+
+        loop = asyncio.new_event_loop()
+        # WHEN
+        try:
+            changelog = loop.run_until_complete(Changelog.aparse(async_records()))
+        finally:
+            loop.close()
+        # THEN
+        assert changelog == Changelog.from_records(records)
+
     def test_groupby(self):
         # GIVEN
         with open(data_file_path('big.gitlog'), encoding='utf-8') as log_file:
@@ -45,6 +103,33 @@ class TestChangelog:
         # THEN
         assert len(node) == len(changelog)
 
+    def test_groupby_order(self):
+        # GIVEN
+        with open(data_file_path('big.gitlog'), encoding='utf-8') as log_file:
+            log = log_file.read()
+        changelog = Changelog.parse(log)
+        # WHEN
+        node = changelog.groupby(Commit.type, Commit.scope)
+        # THEN
+        names = [child.name for child in node.children]
+        assert names == ['feat', 'fix', 'docs', 'style', 'refactor', 'test', 'chore', 'unknown']
+        refactor_scopes = [child.name for child in node.children[4].children]
+        assert refactor_scopes == ['changelog', 'test', 'unknown']
+        unknown_commits = [child.value for child in node.children[-1].children]
+        assert unknown_commits == [commit for commit in changelog if commit.type is None]
+
+    def test_groupby_with_type_order(self, monkeypatch):
+        # GIVEN
+        with open(data_file_path('big.gitlog'), encoding='utf-8') as log_file:
+            log = log_file.read()
+        changelog = Changelog.parse(log)
+        monkeypatch.setattr(CommitMsg, 'TYPES', TypeRegistry(order=('fix', 'test')))
+        # WHEN
+        node = changelog.groupby(Commit.type)
+        # THEN
+        names = [child.name for child in node.children]
+        assert names == ['fix', 'test', 'feat', 'docs', 'style', 'refactor', 'chore', 'unknown']
+
 
 class TestNode:
     def test_len_with_empty_tree(self):
@@ -84,3 +169,66 @@ class TestNode:
         report = node.report()
         # THEN
         assert report == expected
+
+    def test_write_with_big_git_log(self):
+        # GIVEN
+        with open(data_file_path('big.gitlog'), encoding='utf-8') as log_file:
+            log = log_file.read()
+        changelog = Changelog.parse(log)
+        node = changelog.groupby(Commit.type, Commit.scope)
+        with open(data_file_path('big.md'), encoding='utf-8') as md_file:
+            expected = md_file.read()
+        output = StringIO()
+        # WHEN
+        node.write(file=output)
+        # THEN
+        assert output.getvalue() == expected
+
+    def test_len_after_children_change(self):
+        # GIVEN
+        child = Node(children=tuple([Node(), Node()]))
+        tree = Node(children=tuple([child, Node()]))
+        # WHEN
+        child.children = tuple([Node() for _ in range(5)])
+        # THEN
+        assert len(child) == 5
+        assert len(tree) == 6
+
+    def test_depth_level_after_reparent(self):
+        # GIVEN
+        leaf = Node()
+        child = Node(children=tuple([leaf]))
+        assert leaf.depth_level() == 1
+        # WHEN
+        tree = Node(children=tuple([child]))
+        # THEN
+        assert tree.depth_level() == 0
+        assert child.depth_level() == 1
+        assert leaf.depth_level() == 2
+
+    def test_aggregates(self):
+        # GIVEN
+        with open(data_file_path('big.gitlog'), encoding='utf-8') as log_file:
+            log = log_file.read()
+        changelog = Changelog.parse(log)
+        node = changelog.groupby(Commit.type, Commit.scope)
+        # WHEN
+        aggregates = node.aggregates()
+        # THEN
+        assert aggregates.nb_commits == len(changelog)
+        assert aggregates.first_date == min(commit.date for commit in changelog)
+        assert aggregates.last_date == max(commit.date for commit in changelog)
+        assert aggregates.authors == {commit.author for commit in changelog}
+        assert sum(child.aggregates().nb_commits for child in node.children) == len(changelog)
+
+    def test_report_with_stats(self):
+        # GIVEN
+        with open(data_file_path('big.gitlog'), encoding='utf-8') as log_file:
+            log = log_file.read()
+        changelog = Changelog.parse(log)
+        node = changelog.groupby(Commit.type)
+        feat_count = len([commit for commit in changelog if commit.type == CommitType.feat])
+        # WHEN
+        report = node.report(stats=True)
+        # THEN
+        assert report.startswith("# type: feat ({count} commits, 2017-02 to 2017-03)\n".format(count=feat_count))
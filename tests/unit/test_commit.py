@@ -1,6 +1,7 @@
 from smartchangelog import datetools
 from smartchangelog.commit import Commit
 from smartchangelog.commitmsg import CommitType
+from smartchangelog.gitcmd import LogRecord
 from tests.unit import data_file_path
 
 
@@ -54,4 +55,73 @@ class TestCommit:
         # WHEN
         property_name = Commit.property_name(prop)
         # THEN
-        assert property_name == 'author'
\ No newline at end of file
+        assert property_name == 'author'
+
+    def test_iter_parse(self):
+        # GIVEN
+        lines = [
+            "commit 1111111111111111111111111111111111111111",
+            "Merge: 2222222 3333333",
+            "Author: Jérôme Müller <jerome@example.com>",
+            "Date:   2017-03-23 17:30:56 +0100",
+            "",
+            "    fix(parser): handle merges",
+            "    revert commit 4444444444444444444444444444444444444444",
+            "",
+            "commit 2222222222222222222222222222222222222222",
+            "Author: Nicolas Gouzy <nicolas.gouzy@orange.com>",
+            "Date:   2017-03-22 15:28:45 +0100",
+            "",
+            "    Merge branch develop into master",
+        ]
+        # WHEN
+        commits = list(Commit.iter_parse(lines))
+        # THEN
+        assert len(commits) == 2
+        assert commits[0].id == '1111111111111111111111111111111111111111'
+        assert commits[0].author == 'Jérôme Müller <jerome@example.com>'
+        assert commits[0].type == CommitType.fix
+        assert commits[0].body == 'revert commit 4444444444444444444444444444444444444444'
+        assert commits[1].id == '2222222222222222222222222222222222222222'
+        assert commits[1].subject == 'Merge branch develop into master'
+
+    def test_from_record(self):
+        # GIVEN
+        record = LogRecord.parse('a6f79b56acbb9e58327ecf91feed611bb614927f\x1f'
+                                 '597ec5676235e18f5a607726603df944da5be7fe\x1f'
+                                 'Nicolas Gouzy\x1f'
+                                 'nicolas.gouzy@orange.com\x1f'
+                                 '2017-03-23T17:30:56+01:00\x1f'
+                                 'refactor(changelog): better model\nNamedTuple rocks !\n')
+        expected = Commit(
+            id='a6f79b56acbb9e58327ecf91feed611bb614927f',
+            author='Nicolas Gouzy <nicolas.gouzy@orange.com>',
+            date=datetools.str2date('2017-03-23 17:30:56 +0100'),
+            type=CommitType.refactor,
+            scope='changelog',
+            subject='better model',
+            body='NamedTuple rocks !'
+        )
+        # WHEN
+        commit = Commit.from_record(record)
+        # THEN
+        assert record.parents == ('597ec5676235e18f5a607726603df944da5be7fe',)
+        assert commit == expected
+
+    def test_parse_header(self):
+        # GIVEN
+        message = "feat(ui): add button\n\n    first body line\n    second body line\n"
+        # WHEN
+        header = Commit.parse_header(message)
+        # THEN
+        assert header == Commit.Message(type=CommitType.feat, scope='ui', subject='add button', body=None)
+        assert Commit.parse_body(message, conventional=True) == "\nfirst body line\nsecond body line"
+
+    def test_parse_header_with_too_long_body_line(self):
+        # GIVEN
+        message = "feat(ui): add button\n" + "b" * 81
+        # WHEN
+        header = Commit.parse_header(message)
+        # THEN
+        assert header == Commit.Message(subject='feat(ui): add button')
+        assert Commit.parse_message(message).body == "b" * 81
@@ -1,6 +1,6 @@
 import pytest
 
-from smartchangelog.commitmsg import CommitMsg, CommitSyntaxError, CommitType
+from smartchangelog.commitmsg import CommitMsg, CommitSyntaxError, CommitType, TypeRegistry
 
 
 class TestCommitMsg:
@@ -102,6 +102,19 @@ class TestCommitMsg:
             assert commit_msg.subject == "add button"
             assert commit_msg.body == "body first line\nbody second line"
 
+    class TestValidateAll:
+        def test_with_valid_and_invalid_messages(self):
+            # GIVEN
+            messages = [
+                ('a1', 'feat(ui): add button\n'),
+                ('b2', 'bad message\n'),
+                ('c3', 'fix: ' + 'a' * (CommitMsg.FIRSTLINE_MAX_LENGTH + 1)),
+            ]
+            # WHEN
+            violations = list(CommitMsg.validate_all(messages))
+            # THEN
+            assert [violation.id for violation in violations] == ['b2', 'c3']
+
     class TestEquality:
         def test_equality_with_same_commitmsg(self):
             # GIVEN
@@ -179,3 +192,44 @@ class TestCommitType:
         with pytest.raises(TypeError):
             assert ct < s
 
+    def test_ordinal(self):
+        # GIVEN
+        # WHEN
+        ordinals = [ct.ordinal for ct in CommitType]
+        # THEN
+        assert ordinals == list(range(len(CommitType)))
+
+
+class TestTypeRegistry:
+    def test_default_order(self):
+        # GIVEN
+        # WHEN
+        registry = TypeRegistry()
+        # THEN
+        assert registry.types == tuple(CommitType)
+        assert registry.sort_key(CommitType.refactor) == 4
+
+    def test_order(self):
+        # GIVEN
+        # WHEN
+        registry = TypeRegistry(order=('fix', 'chore'))
+        # THEN
+        assert [str(ct) for ct in registry] == ['fix', 'chore', 'feat', 'docs', 'style', 'refactor', 'test']
+        assert registry.sort_key(CommitType.fix) < registry.sort_key(CommitType.feat)
+        assert registry['chore'] == CommitType.chore
+
+    def test_unknown_type_in_order(self):
+        # GIVEN
+        # WHEN
+        with pytest.raises(ValueError, match='unknown types in order: perf'):
+            TypeRegistry(order=('perf',))
+            # THEN
+            pass
+
+    def test_duplicate_type_in_order(self):
+        # GIVEN
+        # WHEN
+        with pytest.raises(ValueError, match='duplicate types in order: fix'):
+            TypeRegistry(order=('fix', 'feat', 'fix'))
+            # THEN
+            pass
@@ -0,0 +1,78 @@
+from smartchangelog.changelog import Changelog
+from smartchangelog.commit import Commit
+from smartchangelog.committable import CommitSelection, CommitTable
+from smartchangelog.gitcmd import LogRecord
+from tests.unit import data_file_path
+
+
+def changelog() -> Changelog:
+    with open(data_file_path('big.gitlog'), encoding='utf-8') as log_file:
+        return Changelog.parse(log_file.read())
+
+
+class TestCommitTable:
+    def test_getitem(self):
+        # GIVEN
+        commits = changelog()
+        # WHEN
+        table = CommitTable(commits)
+        # THEN
+        assert len(table) == len(commits)
+        assert list(table) == commits
+        assert table[-1] == commits[-1]
+        assert table[1:3] == commits[1:3]
+
+    def test_groupby(self):
+        # GIVEN
+        table = CommitTable(changelog())
+        with open(data_file_path('big.md'), encoding='utf-8') as md_file:
+            expected = md_file.read()
+        # WHEN
+        node = table.groupby(Commit.type, Commit.scope)
+        # THEN
+        assert node.report() == expected
+
+    def test_groupby_without_leaf_nodes(self):
+        # GIVEN
+        table = CommitTable(changelog())
+        # WHEN
+        node = table.groupby(Commit.type)
+        # THEN
+        group = node.children[0]
+        assert isinstance(group.commits, CommitSelection)
+        assert len(group) == len(group.commits)
+        assert [child.value.id for child in group.children] == [commit.id for commit in group.commits]
+        assert group.children[0].parent is group
+
+    def test_from_records(self):
+        # GIVEN
+        records = [
+            LogRecord(id='a6f79b56acbb9e58327ecf91feed611bb614927f', parents=(), author='Nicolas Gouzy',
+                      email='nicolas.gouzy@orange.com', date='2017-03-23T17:30:56+01:00',
+                      message='refactor(changelog): better model\n\nNamedTuple rocks !\n'),
+            LogRecord(id='597ec5676235e18f5a607726603df944da5be7fe', parents=(), author='Nicolas Gouzy',
+                      email='nicolas.gouzy@orange.com', date='2017-03-22T15:28:45+01:00',
+                      message='Merge branch develop into master\n\n\nbody\n'),
+        ]
+        # WHEN
+        table = CommitTable.from_records(records)
+        # THEN
+        assert list(table) == Changelog.from_records(records)
+
+    def test_from_records_with_types(self):
+        # GIVEN
+        records = [
+            LogRecord(id='a6f79b56acbb9e58327ecf91feed611bb614927f', parents=(), author='Nicolas Gouzy',
+                      email='nicolas.gouzy@orange.com', date='2017-03-23T17:30:56+01:00',
+                      message='refactor(changelog): better model\n\nNamedTuple rocks !\n'),
+            LogRecord(id='597ec5676235e18f5a607726603df944da5be7fe', parents=(), author='Nicolas Gouzy',
+                      email='nicolas.gouzy@orange.com', date='2017-03-22T15:28:45+01:00',
+                      message='fixing things\n\nfix: not a first line\n'),
+            LogRecord(id='3e3bd1b2f0a4d1ed8a7a1f1d2b8e7e0c9b1d2f3a', parents=(), author='Nicolas Gouzy',
+                      email='nicolas.gouzy@orange.com', date='2017-03-21T10:00:00+01:00',
+                      message='fix(cache): stale rows\n'),
+        ]
+        # WHEN
+        table = CommitTable.from_records(records, types=('fix', 'feat'))
+        # THEN
+        assert [commit.subject for commit in table] == ['stale rows']
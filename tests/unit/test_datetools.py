@@ -37,3 +37,52 @@ def test_date2str():
     string = datetools.date2str(dt)
     # THEN
     assert string == expected
+
+
+def test_isostr2date():
+    # GIVEN
+    expected = datetime(
+        year=2017,
+        month=3,
+        day=21,
+        hour=16,
+        minute=9,
+        second=13,
+        tzinfo=timezone(timedelta(hours=-2, minutes=-30))
+    )
+    string = '2017-03-21T16:09:13-02:30'
+    # WHEN
+    date = datetools.isostr2date(string)
+    # THEN
+    assert date == expected
+    assert date.utcoffset() == expected.utcoffset()
+
+
+def test_str2date_with_negative_utc_offset():
+    # GIVEN
+    expected = datetime(
+        year=2017,
+        month=3,
+        day=21,
+        hour=16,
+        minute=9,
+        second=13,
+        tzinfo=timezone(timedelta(hours=-2, minutes=-30))
+    )
+    string = '2017-03-21 16:09:13 -0230'
+    # WHEN
+    date = datetools.str2date(string)
+    # THEN
+    assert date == expected
+    assert datetools.date2str(date) == string
+
+
+def test_isostr2timestamp():
+    # GIVEN
+    string = '2017-03-21T16:09:13+01:00'
+    expected = int(datetools.isostr2date(string).timestamp()), 3600
+    # WHEN
+    timestamp = datetools.isostr2timestamp(string)
+    # THEN
+    assert timestamp == expected
+    assert datetools.timestamp2date(*timestamp) == datetools.isostr2date(string)
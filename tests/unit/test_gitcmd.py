@@ -1,10 +1,20 @@
+import asyncio
 import os
 import pytest
 
-from smartchangelog.gitcmd import GitCmdError, is_inside_work_tree, get_gitdir, tag
+from smartchangelog.gitcmd import GitCmdError, is_inside_work_tree, get_gitdir, tag, iter_log, async_git_command, \
+    async_iter_log, LogFilter, log_args, RecordSplitter, get_common_gitdir
 from tests.unit import data_dir_path
 
 
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
 @pytest.fixture(scope='function')
 def cmd():
     old_cmd = os.getcwd()
@@ -42,6 +52,17 @@ def test_get_gitdir_ok():
     assert os.path.split(gitdir_path)[-1] == '.git'
 
 
+@pytest.mark.usefixtures('cmd')
+def test_get_common_gitdir_with_cwd():
+    # GIVEN
+    os.chdir(os.path.expanduser('~'))
+    # WHEN
+    gitdir_path = get_common_gitdir(cwd=data_dir_path())
+    # THEN
+    assert os.path.isabs(gitdir_path)
+    assert os.path.isdir(gitdir_path)
+
+
 @pytest.mark.usefixtures('cmd')
 def test_get_gitdir_ko():
     # GIVEN
@@ -62,3 +83,127 @@ def test_get_tag():
     # THEN
     assert len(tags) > 0
 
+
+@pytest.mark.usefixtures('cmd')
+def test_iter_log():
+    # GIVEN
+    os.chdir(data_dir_path())
+    # WHEN
+    records = list(iter_log('HEAD', max_count=1))
+    # THEN
+    assert len(records) == 1
+    assert len(records[0].id) == 40
+
+
+@pytest.mark.usefixtures('cmd')
+def test_iter_log_with_early_termination():
+    # GIVEN
+    os.chdir(data_dir_path())
+    records = iter_log('HEAD')
+    # WHEN
+    first = next(records)
+    records.close()
+    # THEN
+    assert len(first.id) == 40
+
+
+@pytest.mark.usefixtures('cmd')
+def test_iter_log_with_unknown_revision():
+    # GIVEN
+    os.chdir(data_dir_path())
+    # WHEN
+    with pytest.raises(GitCmdError):
+        list(iter_log('unknown-revision'))
+        # THEN
+        pass
+
+
+@pytest.mark.usefixtures('cmd')
+def test_iter_log_with_on_read():
+    # GIVEN
+    os.chdir(data_dir_path())
+    sizes = []
+    # WHEN
+    records = list(iter_log('HEAD', max_count=2, on_read=sizes.append))
+    # THEN
+    assert len(records) == 2
+    assert sum(sizes) > 80
+
+
+def test_record_splitter():
+    # GIVEN
+    splitter = RecordSplitter('\0')
+    chunks = [b'first', b' record\0second \xc3', b'\xa9\0', b'last', b' one']
+    # WHEN
+    records = [record for chunk in chunks for record in splitter.feed(chunk)]
+    # THEN
+    assert records == ['first record', 'second \u00e9']
+    assert splitter.rest() == 'last one'
+
+
+def test_log_args_with_log_filter():
+    # GIVEN
+    log_filter = LogFilter(author='Nicolas', since='2017-01-01', grep=('^feat', '^fix'), paths=('api', 'ui'))
+    # WHEN
+    args, stdin_data = log_args('v1.0..HEAD', log_filter=log_filter)
+    # THEN
+    assert args[-8:] == ['--author=Nicolas', '--since=2017-01-01', '--grep=^feat', '--grep=^fix', 'v1.0..HEAD',
+                         '--', 'api', 'ui']
+    assert stdin_data is None
+
+
+@pytest.mark.usefixtures('cmd')
+def test_async_git_command():
+    # GIVEN
+    os.chdir(data_dir_path())
+    # WHEN
+    head = run(async_git_command('rev-parse', 'HEAD'))
+    # THEN
+    assert len(head) == 40
+
+
+@pytest.mark.usefixtures('cmd')
+def test_async_iter_log():
+    # GIVEN
+    os.chdir(data_dir_path())
+    expected = list(iter_log('HEAD', max_count=5))
+
+    async def read_log():
+        return [record async for record in async_iter_log('HEAD', max_count=5)]
+
+    # WHEN
+    records = run(read_log())
+    # THEN
+    assert records == expected
+
+
+@pytest.mark.usefixtures('cmd')
+def test_async_iter_log_with_early_termination():
+    # GIVEN
+    os.chdir(data_dir_path())
+
+    async def read_first():
+        records = async_iter_log('HEAD')
+        first = await records.__anext__()
+        await records.aclose()
+        return first
+
+    # WHEN
+    first = run(read_first())
+    # THEN
+    assert len(first.id) == 40
+
+
+@pytest.mark.usefixtures('cmd')
+def test_async_iter_log_with_unknown_revision():
+    # GIVEN
+    os.chdir(data_dir_path())
+
+    async def read_log():
+        return [record async for record in async_iter_log('unknown-revision')]
+
+    # WHEN
+    with pytest.raises(GitCmdError):
+        run(read_log())
+        # THEN
+        pass
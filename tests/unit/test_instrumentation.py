@@ -0,0 +1,39 @@
+import time
+
+from smartchangelog.instrumentation import Instrumentation
+
+
+class TestInstrumentation:
+    def test_stage(self):
+        # GIVEN
+        finished = []
+        instrumentation = Instrumentation(listeners=[finished.append])
+        # WHEN
+        with instrumentation.stage('group') as stage:
+            time.sleep(0.01)
+            stage.count = 3
+        # THEN
+        assert finished == instrumentation.stages
+        assert finished[0].name == 'group'
+        assert finished[0].count == 3
+        assert finished[0].seconds >= 0.01
+
+    def test_iterate_inside_stage(self):
+        # GIVEN
+        instrumentation = Instrumentation()
+
+        def slow_records():
+            for i in range(3):
+                time.sleep(0.01)
+                yield i
+
+        # WHEN
+        with instrumentation.stage('parse'):
+            items = list(instrumentation.iterate('git log', slow_records()))
+        # THEN
+        assert items == [0, 1, 2]
+        git_log, parse = instrumentation.stages
+        assert git_log.name == 'git log'
+        assert git_log.count == 3
+        assert git_log.seconds >= 0.03
+        assert parse.seconds < git_log.seconds
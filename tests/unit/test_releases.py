@@ -0,0 +1,73 @@
+from smartchangelog.gitcmd import LogRecord, TagRef
+from smartchangelog.releases import assign_releases
+
+
+def record(commit_id: str, *parents: str) -> LogRecord:
+    return LogRecord(id=commit_id, parents=parents, author='a', email='a@b', date='2017-03-22T15:28:45+01:00',
+                     message='feat: {id}'.format(id=commit_id))
+
+
+class TestAssignReleases:
+    def test_assign_releases(self):
+        # GIVEN
+        #   a <- b <- c <- m <- e
+        #    \            /
+        #     <- side ----
+        records = [record('e', 'm'), record('m', 'c', 'side'), record('side', 'a'), record('c', 'b'),
+                   record('b', 'a'), record('a')]
+        tag_refs = [TagRef(name='v2', commit='m', timestamp=30), TagRef(name='v1', commit='b', timestamp=10),
+                    TagRef(name='side-tag', commit='side', timestamp=20)]
+        # WHEN
+        releases, ordered_releases = assign_releases(records, tag_refs)
+        # THEN
+        assert ordered_releases == ['v1', 'side-tag', 'v2']
+        assert releases == {'a': 'v1', 'b': 'v1', 'side': 'side-tag', 'c': 'v2', 'm': 'v2'}
+
+    def test_assign_releases_with_tags_on_same_commit(self):
+        # GIVEN
+        records = [record('b', 'a'), record('a')]
+        tag_refs = [TagRef(name='v1-final', commit='a', timestamp=20), TagRef(name='v1', commit='a', timestamp=10),
+                    TagRef(name='unknown', commit='z', timestamp=5)]
+        # WHEN
+        releases, ordered_releases = assign_releases(records, tag_refs)
+        # THEN
+        assert ordered_releases == ['v1']
+        assert releases == {'a': 'v1'}
+
+    def test_assign_releases_with_tag_created_after_a_newer_release(self):
+        # GIVEN
+        #   a <- b <- c <- d
+        #   v1 is created after v2, on an ancestor of v2, and side-tag is unrelated to v1
+        records = [record('d', 'c'), record('c', 'b'), record('b', 'a'), record('side', 'a'), record('a')]
+        tag_refs = [TagRef(name='v2', commit='c', timestamp=10), TagRef(name='v1', commit='a', timestamp=30),
+                    TagRef(name='side-tag', commit='side', timestamp=20)]
+        # WHEN
+        releases, ordered_releases = assign_releases(records, tag_refs)
+        # THEN
+        assert ordered_releases == ['v1', 'v2', 'side-tag']
+        assert releases == {'a': 'v1', 'b': 'v2', 'c': 'v2', 'side': 'side-tag'}
+
+    def test_assign_releases_with_git_flow_history(self):
+        # GIVEN
+        #   each release merges 3 feature commits into develop, then develop into master, where it is tagged;
+        #   tags are dated from the newest one, so only their ancestry orders them
+        nb_releases = 1000
+        records = [record('d0')]
+        develop = master = 'd0'
+        for k in range(1, nb_releases + 1):
+            feature = develop
+            for i in range(3):
+                records.append(record('f{k}.{i}'.format(k=k, i=i), feature))
+                feature = 'f{k}.{i}'.format(k=k, i=i)
+            records.append(record('d{k}'.format(k=k), develop, feature))
+            develop = 'd{k}'.format(k=k)
+            records.append(record('m{k}'.format(k=k), master, develop))
+            master = 'm{k}'.format(k=k)
+        tag_refs = [TagRef(name='v{k}'.format(k=k), commit='m{k}'.format(k=k), timestamp=nb_releases - k)
+                    for k in range(1, nb_releases + 1)]
+        # WHEN
+        releases, ordered_releases = assign_releases(reversed(records), tag_refs)
+        # THEN
+        assert ordered_releases == ['v{k}'.format(k=k) for k in range(1, nb_releases + 1)]
+        assert releases['d0'] == 'v1'
+        assert releases['f500.1'] == releases['d500'] == 'v500'
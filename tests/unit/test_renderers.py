@@ -0,0 +1,83 @@
+import json
+from io import StringIO
+
+import pytest
+
+from smartchangelog import renderers
+from smartchangelog.changelog import Changelog
+from smartchangelog.commit import Commit
+from tests.unit import data_file_path
+
+
+def big_changelog() -> Changelog:
+    with open(data_file_path('big.gitlog'), encoding='utf-8') as log_file:
+        return Changelog.parse(log_file.read())
+
+
+class TestRenderers:
+    def test_markdown(self):
+        # GIVEN
+        node = big_changelog().groupby(Commit.type, Commit.scope)
+        output = StringIO()
+        # WHEN
+        renderers.get('markdown').write(node, file=output)
+        # THEN
+        assert output.getvalue() == node.report() + '\n'
+
+    def test_json(self):
+        # GIVEN
+        changelog = big_changelog()
+        node = changelog.groupby(Commit.type)
+        output = StringIO()
+        # WHEN
+        renderers.get('json').write(node, file=output)
+        # THEN
+        document = json.loads(output.getvalue())
+        groups = document['groups']
+        assert [group['name'] for group in groups] == [child.name for child in node.children]
+        assert all(group['criterion'] == 'type' for group in groups)
+        assert sum(len(group['commits']) for group in groups) == len(changelog)
+        unknown_group = groups[-1]
+        assert unknown_group['name'] == 'unknown'
+        assert unknown_group['commits'][0]['type'] is None
+
+    def test_json_without_criteria(self):
+        # GIVEN
+        changelog = big_changelog()
+        node = changelog.groupby()
+        output = StringIO()
+        # WHEN
+        renderers.get('json').write(node, file=output)
+        # THEN
+        document = json.loads(output.getvalue())
+        assert [commit['id'] for commit in document['commits']] == [child.value.id for child in node.children]
+
+    def test_jsonl(self):
+        # GIVEN
+        changelog = big_changelog()
+        node = changelog.groupby(Commit.type, Commit.scope)
+        output = StringIO()
+        # WHEN
+        renderers.get('jsonl').write(node, file=output)
+        # THEN
+        lines = [json.loads(line) for line in output.getvalue().splitlines()]
+        assert len(lines) == len(changelog)
+        commit = next(line for line in lines if line['id'] == 'a6f79b56acbb9e58327ecf91feed611bb614927f')
+        assert commit['groups'] == {'type': 'refactor', 'scope': 'changelog'}
+        assert commit['subject'] == 'better model'
+        assert commit['date'] == '2017-03-23T17:30:56+01:00'
+
+    def test_register_without_write(self):
+        # GIVEN
+        class IncompleteRenderer(renderers.Renderer):
+            pass
+
+        renderers.register('incomplete', IncompleteRenderer)
+        # WHEN
+        try:
+            with pytest.raises(TypeError):
+                renderers.get('incomplete')
+                # THEN
+                pass
+        finally:
+            del renderers.RENDERERS['incomplete']
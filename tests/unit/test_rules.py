@@ -0,0 +1,133 @@
+import json
+import os
+
+import pytest
+
+from smartchangelog.commitmsg import CommitMsg, CommitSyntaxError, CommitType
+from smartchangelog.rules import Rules, RulesError, CustomCommitType, cache_path, find_configs
+
+RULES_FILE = """
+firstline_max_length = 50
+type_order = ['perf', 'fix']
+
+[types]
+perf = 'performance improvement'
+"""
+
+
+@pytest.fixture
+def commit_msg_rules(monkeypatch):
+    for name in ('FIRSTLINE_PATTERN', 'FIRSTLINE_MAX_LENGTH', 'BODY_MAX_LENGTH', 'TYPES'):
+        monkeypatch.setattr(CommitMsg, name, getattr(CommitMsg, name))
+
+
+@pytest.fixture
+def repository(tmpdir, monkeypatch):
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmpdir.join('cache')))
+    repository = tmpdir.mkdir('repository')
+    repository.mkdir('.git')
+    return repository
+
+
+class TestRules:
+    def test_from_config(self):
+        # GIVEN
+        config = {'body_max_length': 100, 'types': {'perf': 'performance improvement'}, 'type_order': ['perf']}
+        # WHEN
+        rules = Rules.from_config(config)
+        # THEN
+        assert rules.body_max_length == 100
+        assert rules.firstline_max_length == 70
+        perf = CustomCommitType(name='perf', value='performance improvement', ordinal=len(CommitType))
+        assert rules.types.types[0] == perf
+        assert rules.types['feat'] == CommitType.feat
+        assert str(perf) == 'perf'
+        assert CommitType.chore < perf
+
+    @pytest.mark.parametrize('config', [
+        {'unknown': 1},
+        {'firstline_pattern': '^(.+)$'},
+        {'firstline_pattern': '('},
+        {'body_max_length': 0},
+        {'types': {'feat': 'again'}},
+        {'type_order': ['perf']},
+        {'type_order': ['fix', 'fix']},
+    ])
+    def test_from_invalid_config(self, config):
+        # GIVEN
+        # WHEN
+        with pytest.raises(RulesError):
+            Rules.from_config(config)
+            # THEN
+            pass
+
+    def test_load_without_rules_file(self, repository):
+        # GIVEN
+        # WHEN
+        rules = Rules.load(str(repository.mkdir('sub')))
+        # THEN
+        assert rules.types.types == tuple(CommitType)
+        assert rules.firstline_pattern.pattern == CommitMsg.FIRSTLINE_PATTERN.pattern
+
+    @pytest.mark.usefixtures('commit_msg_rules')
+    def test_load_and_apply(self, repository):
+        # GIVEN
+        repository.join('.smartchangelog.toml').write(RULES_FILE)
+        # WHEN
+        Rules.load(str(repository)).apply()
+        # THEN
+        assert CommitMsg.parse('perf(parser): faster').type.name == 'perf'
+        with pytest.raises(CommitSyntaxError):
+            CommitMsg.parse('fix: ' + 'x' * 50)
+
+    def test_load_from_cache(self, repository):
+        # GIVEN
+        rules_file = repository.join('.smartchangelog.toml')
+        rules_file.write(RULES_FILE)
+        first = Rules.load(str(repository))
+        # WHEN
+        second = Rules.load(str(repository))
+        mtime_ns = os.stat(str(rules_file)).st_mtime_ns
+        rules_file.write(RULES_FILE.replace('50', '60'))
+        os.utime(str(rules_file), ns=(mtime_ns, mtime_ns))
+        third = Rules.load(str(repository))
+        # THEN
+        with open(cache_path(str(rules_file)), encoding='utf-8') as cache_file:
+            assert json.load(cache_file)['config']['firstline_max_length'] == 60
+        assert second.types.types == first.types.types
+        assert third.firstline_max_length == 60
+
+    def test_load_from_pyproject(self, repository):
+        # GIVEN
+        repository.join('pyproject.toml').write('[tool.smartchangelog]\nbody_max_length = 120\n')
+        # WHEN
+        rules = Rules.load(str(repository))
+        # THEN
+        assert rules.body_max_length == 120
+
+    def test_load_from_pyproject_without_rules(self, repository):
+        # GIVEN
+        repository.join('.smartchangelog.toml').write(RULES_FILE)
+        service = repository.mkdir('service')
+        service.join('pyproject.toml').write('[build-system]\nrequires = ["setuptools"]\n')
+        # WHEN
+        rules = Rules.load(str(service))
+        # THEN
+        assert rules.firstline_max_length == 50
+
+    def test_load_from_pyproject_without_toml_library(self, repository, monkeypatch):
+        # GIVEN
+        monkeypatch.setattr('smartchangelog.rules.toml_available', lambda: False)
+        repository.join('pyproject.toml').write('[tool.smartchangelog]\nbody_max_length = 120\n')
+        # WHEN
+        rules = Rules.load(str(repository))
+        # THEN
+        assert rules.body_max_length == CommitMsg.BODY_MAX_LENGTH
+
+    def test_find_configs_stops_at_work_tree_top(self, repository):
+        # GIVEN
+        repository.dirpath().join('.smartchangelog.toml').write(RULES_FILE)
+        # WHEN
+        paths = list(find_configs(str(repository)))
+        # THEN
+        assert paths == []